@@ -3,15 +3,26 @@
 # Professor Saúl Blanco
 # Do not share these assignments or their solutions outside of this class.
 
+import collections
 import csv
-import itertools
+import multiprocessing
+import threading
+import time
+
+# the number of set bits of a candidate mask
+# int.bit_count is only there from Python 3.10, so older versions count the 1s of the binary string instead
+try:
+    popcount = int.bit_count
+except AttributeError:
+    def popcount(mask):
+        return bin(mask).count('1')
 
 class Board():
 
     ##########################################
     ####   Constructor
     ##########################################
-    def __init__(self, filename):
+    def __init__(self, filename=None):
 
         # initialize all of the variables
         self.n2 = 0
@@ -24,44 +35,125 @@ class Board():
         self.unsolvedSpaces = None
 
         # load the file and initialize the in-memory board with the data
-        self.loadSudoku(filename)
+        # (without a filename the board stays empty until loadRows is called)
+        if filename is not None:
+            self.loadSudoku(filename)
+
+
+    # builds a board from rows of values that are already in memory
+    @classmethod
+    def fromRows(cls, rows):
+
+        board = cls()
+        board.loadRows(rows)
+        return board
+
+
+    # builds a board from a flat list of n^4 ints in row order, where 0 marks an empty space
+    @classmethod
+    def fromValues(cls, values):
+
+        board = cls()
+        board.loadValues(values)
+        return board
+
+
+    # builds a board from a puzzle line (e.g. the 81 character format with '.' for empty spaces,
+    # or n^4 comma separated values) or from the text of a CSV file
+    @classmethod
+    def fromString(cls, text):
+
+        text = text.strip()
+        if '\n' in text:
+            return cls.fromRows(csv.reader(text.splitlines()))
+        return cls.fromValues(parsePuzzleLine(text))
+
+
+    # builds a board from a grid (a list of rows), a flat list, or anything with tolist() such as a NumPy array
+    # empty spaces may be 0, None, or ''
+    @classmethod
+    def fromList(cls, grid):
+
+        if hasattr(grid, 'tolist'):
+            grid = grid.tolist()
+        if grid and isinstance(grid[0], (list, tuple)):
+            grid = [value for row in grid for value in row]
+        return cls.fromValues([int(value) if value else 0 for value in grid])
+
+
+    # builds a board from a memory buffer (bytes, bytearray, memoryview, mmap) holding a puzzle line or CSV text
+    @classmethod
+    def fromBuffer(cls, buffer):
+
+        return cls.fromString(bytes(buffer).decode())
 
 
     # loads the sudoku board from the given file
     def loadSudoku(self, filename):
 
         with open(filename) as csvFile:
-            self.n = -1
-            reader = csv.reader(csvFile)
-            for row in reader:
-
-                # Assign the n value and construct the approriately sized dependent data
-                if self.n == -1:
-                    self.n = int(len(row) ** (1/2))
-                    if not self.n ** 2 == len(row):
-                        raise Exception('Each row must have n^2 values! (See row 0)')
-                    else:
-                        self.n2 = len(row)
-                        self.spaces = self.n ** 4
-                        self.board = {}
-                        self.valsInRows = [set() for _ in range(self.n2)]
-                        self.valsInCols = [set() for _ in range(self.n2)]
-                        self.valsInBoxes = [set() for _ in range(self.n2)]
-                        self.unsolvedSpaces = set(itertools.product(range(self.n2), range(self.n2)))
-
-                # check if each row has the correct number of values
-                else:
-                    if len(row) != self.n2:
-                        raise Exception('Each row must have the same number of values. (See row ' + str(reader.line_num - 1) + ')')
+            self.loadRows(csv.reader(csvFile))
+
+
+    # loads the sudoku board from an iterable of rows, where each row holds n^2 strings and '' marks an empty space
+    def loadRows(self, rows):
+
+        n2 = -1
+        values = []
+        for rowNum, row in enumerate(rows):
+
+            # Assign the n value from the length of the first row
+            if n2 == -1:
+                n = int(len(row) ** (1/2))
+                if not n ** 2 == len(row):
+                    raise Exception('Each row must have n^2 values! (See row 0)')
+                n2 = len(row)
+
+            # check if each row has the correct number of values
+            elif len(row) != n2:
+                raise Exception('Each row must have the same number of values. (See row ' + str(rowNum) + ')')
+
+            values.extend([int(item) if item != '' else 0 for item in row])
+
+        self.loadValues(values)
+
+
+    # sets up the sizes for a flat list of n^4 values and checks that every value fits on the board
+    def checkValues(self, values):
+
+        n2 = int(round(len(values) ** (1/2)))
+        n = int(round(n2 ** (1/2)))
+        if n ** 4 != len(values) or n == 0:
+            raise Exception('A board must have n^4 values, found ' + str(len(values)))
+        if min(values) < 0 or max(values) > n2:
+            raise Exception('Every value must be between 1 and ' + str(n2) + ' (or 0 for an empty space)')
+
+        self.n = n
+        self.n2 = n2
+        self.spaces = n2 * n2
 
-                # add each value to the correct place in the board; record that the row, col, and box contains value
-                for index, item in enumerate(row):
-                    if not item == '':
-                        self.board[(reader.line_num-1, index)] = int(item)
-                        self.valsInRows[reader.line_num-1].add(int(item))
-                        self.valsInCols[index].add(int(item))
-                        self.valsInBoxes[self.spaceToBox(reader.line_num-1, index)].add(int(item))
-                        self.unsolvedSpaces.remove((reader.line_num-1, index))
+
+    # loads the sudoku board from a flat list of n^4 ints in row order, where 0 marks an empty space
+    def loadValues(self, values):
+
+        self.checkValues(values)
+        n2 = self.n2
+        self.board = {}
+        self.unsolvedSpaces = set()
+        self.valsInRows = [set() for _ in range(n2)]
+        self.valsInCols = [set() for _ in range(n2)]
+        self.valsInBoxes = [set() for _ in range(n2)]
+
+        # add each value to the correct place in the board; record that the row, col, and box contains value
+        for i, value in enumerate(values):
+            space = divmod(i, n2)
+            if value:
+                self.board[space] = value
+                self.valsInRows[space[0]].add(value)
+                self.valsInCols[space[1]].add(value)
+                self.valsInBoxes[self.spaceToBox(space[0], space[1])].add(value)
+            else:
+                self.unsolvedSpaces.add(space)
 
 
     ##########################################
@@ -155,6 +247,11 @@ class Board():
         else:
             return True
 
+    # returns the values that can currently be placed in the space, in increasing order
+    def getValidValues(self, space):
+
+        return [value for value in range(1, self.n2 + 1) if self.isValidMove(space, value)]
+
     # optional helper function for use by getMostConstrainedUnsolvedSpace
     def evaluateSpace(self, space):
 
@@ -176,6 +273,775 @@ class Board():
             return None
         return max(unsolvedSpaces, key = unsolvedSpaces.get)
 
+# Board that stores the row, col, and box contents as integer bitmasks instead of sets
+# bit (value - 1) of a mask is set when value is present
+# each unsolved space also keeps a candidate mask that makeMove/undoMove keep up to date,
+# so checking a move or counting the constraints on a space is a couple of bit operations
+class BitBoard(Board):
+
+    ##########################################
+    ####   Constructor
+    ##########################################
+    def __init__(self, filename=None):
+
+        self.full = 0
+        self.cells = None
+        self.rowMasks = None
+        self.colMasks = None
+        self.boxMasks = None
+        self.candidates = None
+        self.rowOf = None
+        self.colOf = None
+        self.boxOf = None
+        self.peers = None
+
+        super().__init__(filename)
+
+
+    # loads the board straight into the bitmasks (the sets of Board are never built)
+    def loadValues(self, values):
+
+        self.checkValues(values)
+        n2 = self.n2
+        self.board = {divmod(i, n2): value for i, value in enumerate(values) if value}
+        self.unsolvedSpaces = set(divmod(i, n2) for i, value in enumerate(values) if not value)
+        self.buildMasks(values)
+
+
+    # the row, col, and box of every space and the peers of every space only depend on n,
+    # so they are built once per order and shared (read-only) by every board of that order
+    layouts = {}
+
+    @classmethod
+    def getLayout(cls, n):
+
+        if n not in cls.layouts:
+            n2 = n * n
+            spaces = n2 * n2
+            rowOf = [i // n2 for i in range(spaces)]
+            colOf = [i % n2 for i in range(spaces)]
+            boxOf = [n * (rowOf[i] // n) + colOf[i] // n for i in range(spaces)]
+
+            # every other space that shares a row, col, or box with each space
+            rows = [[] for _ in range(n2)]
+            cols = [[] for _ in range(n2)]
+            boxes = [[] for _ in range(n2)]
+            for i in range(spaces):
+                rows[rowOf[i]].append(i)
+                cols[colOf[i]].append(i)
+                boxes[boxOf[i]].append(i)
+            peers = []
+            for i in range(spaces):
+                peers.append(sorted(set(rows[rowOf[i]] + cols[colOf[i]] + boxes[boxOf[i]]) - {i}))
+            cls.layouts[n] = (rowOf, colOf, boxOf, peers)
+        return cls.layouts[n]
+
+
+    # builds the flat arrays (indexed by row * n2 + col) from the flat list of values
+    def buildMasks(self, values):
+
+        n2, spaces = self.n2, self.spaces
+        self.full = full = (1 << n2) - 1
+        self.cells = cells = list(values)
+        self.rowMasks = rowMasks = [0] * n2
+        self.colMasks = colMasks = [0] * n2
+        self.boxMasks = boxMasks = [0] * n2
+        self.rowOf, self.colOf, self.boxOf, self.peers = rowOf, colOf, boxOf, _ = self.getLayout(self.n)
+
+        for i in range(spaces):
+            if cells[i]:
+                bit = 1 << (cells[i] - 1)
+                rowMasks[rowOf[i]] |= bit
+                colMasks[colOf[i]] |= bit
+                boxMasks[boxOf[i]] |= bit
+
+        self.candidates = [0 if cells[i] else full & ~(rowMasks[rowOf[i]] | colMasks[colOf[i]] | boxMasks[boxOf[i]])
+                           for i in range(spaces)]
+
+        # the sets of Board are replaced by the masks above
+        self.valsInRows = None
+        self.valsInCols = None
+        self.valsInBoxes = None
+
+
+    ##########################################
+    ####   Move Functions
+    ##########################################
+
+    # makes a move, records it in the row, col, and box masks, and removes value from the candidates of every peer
+    def makeMove(self, space, value):
+
+        i = space[0] * self.n2 + space[1]
+        bit = 1 << (value - 1)
+
+        self.board[space] = value
+        self.cells[i] = value
+        self.rowMasks[space[0]] |= bit
+        self.colMasks[space[1]] |= bit
+        self.boxMasks[self.boxOf[i]] |= bit
+        self.unsolvedSpaces.discard(space)
+
+        candidates = self.candidates
+        candidates[i] = 0
+        for p in self.peers[i]:
+            candidates[p] &= ~bit
+
+
+    # removes the move from the board and the masks, and recomputes the candidates of the space and its empty peers
+    def undoMove(self, space, value):
+
+        i = space[0] * self.n2 + space[1]
+        bit = ~(1 << (value - 1))
+
+        del self.board[space]
+        self.cells[i] = 0
+        self.rowMasks[space[0]] &= bit
+        self.colMasks[space[1]] &= bit
+        self.boxMasks[self.boxOf[i]] &= bit
+        self.unsolvedSpaces.add(space)
+
+        full, cells, candidates = self.full, self.cells, self.candidates
+        rowMasks, colMasks, boxMasks = self.rowMasks, self.colMasks, self.boxMasks
+        rowOf, colOf, boxOf = self.rowOf, self.colOf, self.boxOf
+        candidates[i] = full & ~(rowMasks[rowOf[i]] | colMasks[colOf[i]] | boxMasks[boxOf[i]])
+        for p in self.peers[i]:
+            if not cells[p]:
+                candidates[p] = full & ~(rowMasks[rowOf[p]] | colMasks[colOf[p]] | boxMasks[boxOf[p]])
+
+
+    # returns True if the space is empty and on the board, and value is still a candidate for it
+    def isValidMove(self, space, value):
+
+        if space not in self.unsolvedSpaces or not 1 <= value <= self.n2:
+            return False
+        return (self.candidates[space[0] * self.n2 + space[1]] >> (value - 1)) & 1 == 1
+
+
+    # reads the values straight off the candidate mask of the space
+    def getValidValues(self, space):
+
+        if space not in self.unsolvedSpaces:
+            return []
+        mask = self.candidates[space[0] * self.n2 + space[1]]
+        values = []
+        while mask:
+            low = mask & -mask
+            values.append(low.bit_length())
+            mask ^= low
+        return values
+
+
+    # number of distinct values already used by the row, col, and box of the space
+    def evaluateSpace(self, space):
+
+        return self.n2 - popcount(self.candidates[space[0] * self.n2 + space[1]])
+
+
+    # gets the unsolved space with the fewest candidates (the most constraints)
+    # returns None if unsolvedSpaces is empty
+    def getMostConstrainedUnsolvedSpace(self):
+
+        n2, candidates = self.n2, self.candidates
+        best = None
+        bestCount = n2 + 1
+        for space in self.unsolvedSpaces:
+            count = popcount(candidates[space[0] * n2 + space[1]])
+            if count < bestCount:
+                best = space
+                bestCount = count
+                if count == 0:
+                    break
+        return best
+
+# BitBoard that keeps its unsolved spaces in a bucket queue, so choosing the most constrained space does not
+# rescan every unsolved space at every node
+# a space sits in the bucket for its number of candidates; bit k of nonEmpty is set while bucket k holds a space,
+# so the most constrained spaces are in the bucket of the lowest set bit
+# makeMove/undoMove already visit every peer to update the candidate masks, and a peer that loses (or gets back)
+# the value moves down (or up) one bucket on the way
+# the buckets are dicts used as ordered sets: ties go to the space that entered its bucket last, which is a peer of
+# a recent move
+# getValidValues returns the values in increasing order like BitBoard; set leastConstrainingValue to True (on the
+# class or a board) to get them in least-constraining-value order instead, where the value that the fewest empty
+# peers still have as a candidate comes first
+class BucketBoard(BitBoard):
+
+    leastConstrainingValue = False
+
+    ##########################################
+    ####   Constructor
+    ##########################################
+    def __init__(self, filename=None):
+
+        self.keys = None
+        self.buckets = None
+        self.nonEmpty = 0
+
+        super().__init__(filename)
+
+
+    # loads the board into the bitmasks, then puts every empty space in the bucket for its candidate count
+    def loadValues(self, values):
+
+        super().loadValues(values)
+        cells, candidates = self.cells, self.candidates
+        self.keys = keys = [-1] * self.spaces
+        self.buckets = buckets = [{} for _ in range(self.n2 + 1)]
+        nonEmpty = 0
+        for i in range(self.spaces):
+            if not cells[i]:
+                keys[i] = key = popcount(candidates[i])
+                buckets[key][i] = None
+                nonEmpty |= 1 << key
+        self.nonEmpty = nonEmpty
+
+
+    ##########################################
+    ####   Move Functions
+    ##########################################
+
+    # makes a move like BitBoard, moving every empty peer that loses value as a candidate down one bucket
+    def makeMove(self, space, value):
+
+        i = space[0] * self.n2 + space[1]
+        bit = 1 << (value - 1)
+
+        self.board[space] = value
+        self.cells[i] = value
+        self.rowMasks[space[0]] |= bit
+        self.colMasks[space[1]] |= bit
+        self.boxMasks[self.boxOf[i]] |= bit
+        self.unsolvedSpaces.discard(space)
+
+        candidates, keys, buckets, nonEmpty = self.candidates, self.keys, self.buckets, self.nonEmpty
+        candidates[i] = 0
+        key = keys[i]
+        bucket = buckets[key]
+        del bucket[i]
+        if not bucket:
+            nonEmpty ^= 1 << key
+        keys[i] = -1
+
+        # filled peers have no candidates, so only empty peers can lose the bit
+        for p in self.peers[i]:
+            if candidates[p] & bit:
+                candidates[p] ^= bit
+                key = keys[p]
+                bucket = buckets[key]
+                del bucket[p]
+                if not bucket:
+                    nonEmpty ^= 1 << key
+                key -= 1
+                buckets[key][p] = None
+                nonEmpty |= 1 << key
+                keys[p] = key
+        self.nonEmpty = nonEmpty
+
+
+    # takes a move back like BitBoard, putting the space back in a bucket and moving every empty peer that gets
+    # value back as a candidate up one bucket
+    def undoMove(self, space, value):
+
+        i = space[0] * self.n2 + space[1]
+        bit = ~(1 << (value - 1))
+
+        del self.board[space]
+        self.cells[i] = 0
+        self.rowMasks[space[0]] &= bit
+        self.colMasks[space[1]] &= bit
+        self.boxMasks[self.boxOf[i]] &= bit
+        self.unsolvedSpaces.add(space)
+
+        full, cells, candidates = self.full, self.cells, self.candidates
+        rowMasks, colMasks, boxMasks = self.rowMasks, self.colMasks, self.boxMasks
+        rowOf, colOf, boxOf = self.rowOf, self.colOf, self.boxOf
+        keys, buckets = self.keys, self.buckets
+        candidates[i] = mask = full & ~(rowMasks[rowOf[i]] | colMasks[colOf[i]] | boxMasks[boxOf[i]])
+        keys[i] = key = popcount(mask)
+        buckets[key][i] = None
+        nonEmpty = self.nonEmpty | 1 << key
+
+        # only value can come back, so a peer whose mask changed has exactly one more candidate
+        for p in self.peers[i]:
+            if not cells[p]:
+                mask = full & ~(rowMasks[rowOf[p]] | colMasks[colOf[p]] | boxMasks[boxOf[p]])
+                if mask != candidates[p]:
+                    candidates[p] = mask
+                    key = keys[p]
+                    bucket = buckets[key]
+                    del bucket[p]
+                    if not bucket:
+                        nonEmpty ^= 1 << key
+                    key += 1
+                    buckets[key][p] = None
+                    nonEmpty |= 1 << key
+                    keys[p] = key
+        self.nonEmpty = nonEmpty
+
+
+    # the candidates of the space in increasing order like BitBoard, or with leastConstrainingValue on, trying first
+    # the value that rules out the fewest candidates of its empty peers
+    def getValidValues(self, space):
+
+        values = super().getValidValues(space)
+        if self.leastConstrainingValue and len(values) > 1:
+            candidates, peers = self.candidates, self.peers[space[0] * self.n2 + space[1]]
+            values.sort(key=lambda value: sum(candidates[p] >> (value - 1) & 1 for p in peers))
+        return values
+
+
+    # takes the space that entered the lowest non-empty bucket last, without scanning the buckets
+    # returns None if unsolvedSpaces is empty
+    def getMostConstrainedUnsolvedSpace(self):
+
+        nonEmpty = self.nonEmpty
+        if not nonEmpty:
+            return None
+        i = next(reversed(self.buckets[(nonEmpty & -nonEmpty).bit_length() - 1]))
+        return (self.rowOf[i], self.colOf[i])
+
+# BitBoard that runs constraint propagation to a fixpoint after every move:
+#   naked singles    - a space with one candidate left gets that value
+#   hidden singles   - a value with one possible space left in a row, col, or box goes there
+#   pointing         - a value confined to one row (or col) of a box is removed from the rest of that row (or col)
+#   claiming         - a value confined to one box within a row (or col) is removed from the rest of that box
+# the candidate masks are no longer derived from the row/col/box masks, so every assignment and
+# elimination is recorded on a trail, and undoMove rolls back everything the matching makeMove caused
+# the givens are propagated once while loading, so the loaded board already contains their deductions
+class PropagatingBoard(BitBoard):
+
+    # kinds of trail entries
+    ASSIGN = 0
+    ELIMINATE = 1
+
+    ##########################################
+    ####   Constructor
+    ##########################################
+    def __init__(self, filename=None):
+
+        self.units = None
+        self.intersections = None
+        self.trail = []
+        self.marks = []
+        self.contradiction = False
+
+        super().__init__(filename)
+
+
+    # loads the board, then applies every deduction that follows from the givens
+    def loadValues(self, values):
+
+        super().loadValues(values)
+        self.buildUnits()
+        self.propagate()
+        self.trail = []
+
+
+    # builds the space lists for every row, col, and box, and for every box/line intersection
+    # the remainder of the line and the remainder of the box (shared by every board of the same order)
+    unitLayouts = {}
+
+    def buildUnits(self):
+
+        n, n2 = self.n, self.n2
+        if n not in self.unitLayouts:
+            rows = [[r * n2 + c for c in range(n2)] for r in range(n2)]
+            cols = [[r * n2 + c for r in range(n2)] for c in range(n2)]
+            boxes = [[i for i in range(self.spaces) if self.boxOf[i] == b] for b in range(n2)]
+
+            intersections = []
+            for b in range(n2):
+                for lines, lineOf in ((rows, self.rowOf), (cols, self.colOf)):
+                    for line in sorted(set(lineOf[i] for i in boxes[b])):
+                        segment = [i for i in boxes[b] if lineOf[i] == line]
+                        lineRest = [i for i in lines[line] if self.boxOf[i] != b]
+                        boxRest = [i for i in boxes[b] if lineOf[i] != line]
+                        intersections.append((segment, lineRest, boxRest))
+            self.unitLayouts[n] = (rows + cols + boxes, intersections)
+
+        self.units, self.intersections = self.unitLayouts[n]
+
+
+    ##########################################
+    ####   Move Functions
+    ##########################################
+
+    # makes a move and propagates it, remembering where on the trail the move started
+    def makeMove(self, space, value):
+
+        self.marks.append((len(self.trail), self.contradiction))
+        self.assign(space[0] * self.n2 + space[1], value)
+        self.propagate()
+
+
+    # rolls back the matching makeMove along with every assignment and elimination it inferred
+    def undoMove(self, space, value):
+
+        mark, self.contradiction = self.marks.pop()
+        trail, candidates = self.trail, self.candidates
+        while len(trail) > mark:
+            kind, i, mask = trail.pop()
+            if kind == self.ASSIGN:
+                bit = ~(1 << (self.cells[i] - 1))
+                del self.board[(self.rowOf[i], self.colOf[i])]
+                self.cells[i] = 0
+                self.rowMasks[self.rowOf[i]] &= bit
+                self.colMasks[self.colOf[i]] &= bit
+                self.boxMasks[self.boxOf[i]] &= bit
+                self.unsolvedSpaces.add((self.rowOf[i], self.colOf[i]))
+            candidates[i] = mask
+
+
+    # no move is valid once propagation has found a contradiction, so the solver backs out right away
+    def isValidMove(self, space, value):
+
+        if self.contradiction:
+            return False
+        return super().isValidMove(space, value)
+
+
+    def getValidValues(self, space):
+
+        if self.contradiction:
+            return []
+        return super().getValidValues(space)
+
+
+    ##########################################
+    ####   Propagation
+    ##########################################
+
+    # places value in space i and removes it from the candidates of the peers
+    def assign(self, i, value):
+
+        bit = 1 << (value - 1)
+        candidates = self.candidates
+        if not candidates[i] & bit:
+            self.contradiction = True
+            return
+
+        self.trail.append((self.ASSIGN, i, candidates[i]))
+        self.board[(self.rowOf[i], self.colOf[i])] = value
+        self.cells[i] = value
+        self.rowMasks[self.rowOf[i]] |= bit
+        self.colMasks[self.colOf[i]] |= bit
+        self.boxMasks[self.boxOf[i]] |= bit
+        self.unsolvedSpaces.discard((self.rowOf[i], self.colOf[i]))
+        candidates[i] = 0
+
+        for p in self.peers[i]:
+            if candidates[p] & bit:
+                self.eliminate(p, bit)
+
+
+    # removes the values in mask from the candidates of the empty space i
+    # returns True if anything was removed
+    def eliminate(self, i, mask):
+
+        candidates = self.candidates
+        if self.cells[i] or not candidates[i] & mask:
+            return False
+        self.trail.append((self.ELIMINATE, i, candidates[i]))
+        candidates[i] &= ~mask
+        if candidates[i] == 0:
+            self.contradiction = True
+        return True
+
+
+    # assigns naked and hidden singles until there are none left
+    # returns True if anything was assigned
+    def assignSingles(self):
+
+        cells, candidates, full = self.cells, self.candidates, self.full
+        changed = False
+
+        # naked singles
+        for i in range(self.spaces):
+            mask = candidates[i]
+            if not cells[i] and mask & (mask - 1) == 0:
+                if mask == 0:
+                    self.contradiction = True
+                    return changed
+                self.assign(i, mask.bit_length())
+                changed = True
+                if self.contradiction:
+                    return changed
+
+        # hidden singles: track which values appear as a candidate once, and which more than once
+        for unit in self.units:
+            once = twice = placed = 0
+            for i in unit:
+                if cells[i]:
+                    placed |= 1 << (cells[i] - 1)
+                else:
+                    twice |= once & candidates[i]
+                    once |= candidates[i]
+
+            if full & ~(once | placed):
+                self.contradiction = True
+                return changed
+
+            singles = once & ~twice
+            if singles:
+                for i in unit:
+                    mask = candidates[i] & singles
+                    if mask and not cells[i]:
+                        if mask & (mask - 1):
+                            self.contradiction = True
+                            return changed
+                        self.assign(i, mask.bit_length())
+                        changed = True
+                        if self.contradiction:
+                            return changed
+        return changed
+
+
+    # applies pointing and claiming eliminations at every box/line intersection
+    # returns True if anything was eliminated
+    def eliminateLocked(self):
+
+        candidates = self.candidates
+        changed = False
+        for segment, lineRest, boxRest in self.intersections:
+            segmentMask = 0
+            for i in segment:
+                segmentMask |= candidates[i]
+            if not segmentMask:
+                continue
+
+            lineMask = boxMask = 0
+            for i in lineRest:
+                lineMask |= candidates[i]
+            for i in boxRest:
+                boxMask |= candidates[i]
+
+            # pointing: values that only appear in this segment of the box leave the rest of the line
+            pointing = segmentMask & ~boxMask
+            if pointing & lineMask:
+                for i in lineRest:
+                    changed |= self.eliminate(i, pointing)
+
+            # claiming: values that only appear in this segment of the line leave the rest of the box
+            claiming = segmentMask & ~lineMask
+            if claiming & boxMask:
+                for i in boxRest:
+                    changed |= self.eliminate(i, claiming)
+
+            if self.contradiction:
+                return changed
+        return changed
+
+
+    # runs the deductions to a fixpoint, or until a contradiction is found
+    def propagate(self):
+
+        while not self.contradiction:
+            if self.assignSingles():
+                continue
+            if self.contradiction or not self.eliminateLocked():
+                break
+
+# opt-in search statistics for any board
+# attach(board) wraps makeMove, undoMove, isValidMove, getValidValues, and getMostConstrainedUnsolvedSpace on that
+# board instance only, so a board that is not attached runs the plain methods and pays nothing
+#   makeMoves / undoMoves                - call counts
+#   isValidMoves                         - values checked: isValidMove calls, plus the values getValidValues hands
+#                                          out on boards that read them from a mask instead of calling isValidMove
+#   depthHistogram                       - how many moves were made at each search depth
+#   branchingHistogram                   - how many valid values the chosen space had at each choice
+#   selectSeconds / selections           - time spent choosing the most constrained space, and how often
+# callback, if given, is called as callback(stats, space, branching) after every choice
+class SearchStats:
+
+    WRAPPED = ('makeMove', 'undoMove', 'isValidMove', 'getValidValues', 'getMostConstrainedUnsolvedSpace')
+
+    ##########################################
+    ####   Constructor
+    ##########################################
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        self.makeMoves = 0
+        self.undoMoves = 0
+        self.isValidMoves = 0
+        self.depth = 0
+        self.maxDepth = 0
+        self.depthHistogram = {}
+        self.branchingHistogram = {}
+        self.selectSeconds = 0.0
+        self.selections = 0
+        self.measuring = False
+
+    ##########################################
+    ####   Attaching
+    ##########################################
+
+    # starts recording the search on board
+    def attach(self, board):
+
+        makeMove, undoMove = board.makeMove, board.undoMove
+        isValidMove, select = board.isValidMove, board.getMostConstrainedUnsolvedSpace
+        getValidValues = board.getValidValues
+
+        def countedMakeMove(space, value):
+            self.makeMoves += 1
+            self.depth += 1
+            self.depthHistogram[self.depth] = self.depthHistogram.get(self.depth, 0) + 1
+            if self.depth > self.maxDepth:
+                self.maxDepth = self.depth
+            makeMove(space, value)
+
+        def countedUndoMove(space, value):
+            self.undoMoves += 1
+            self.depth -= 1
+            undoMove(space, value)
+
+        def countedIsValidMove(space, value):
+            if not self.measuring:
+                self.isValidMoves += 1
+            return isValidMove(space, value)
+
+        def countedGetValidValues(space):
+            before = self.isValidMoves
+            values = getValidValues(space)
+            # Board builds the list through isValidMove, which is already counted
+            if not self.measuring and self.isValidMoves == before:
+                self.isValidMoves += len(values)
+            return values
+
+        def timedSelect():
+            start = time.perf_counter()
+            space = select()
+            self.selectSeconds += time.perf_counter() - start
+            self.selections += 1
+            if space is not None:
+                # counting the choices should not show up in the isValidMove count
+                self.measuring = True
+                branching = len(board.getValidValues(space))
+                self.measuring = False
+                self.branchingHistogram[branching] = self.branchingHistogram.get(branching, 0) + 1
+                if self.callback is not None:
+                    self.callback(self, space, branching)
+            return space
+
+        board.makeMove = countedMakeMove
+        board.undoMove = countedUndoMove
+        board.isValidMove = countedIsValidMove
+        board.getValidValues = countedGetValidValues
+        board.getMostConstrainedUnsolvedSpace = timedSelect
+        return self
+
+
+    # stops recording, putting the board's own methods back
+    def detach(self, board):
+
+        for name in self.WRAPPED:
+            board.__dict__.pop(name, None)
+
+
+    # average number of valid values at a choice
+    def meanBranching(self):
+
+        choices = sum(self.branchingHistogram.values())
+        if not choices:
+            return 0.0
+        return sum(branching * count for branching, count in self.branchingHistogram.items()) / choices
+
+
+    # returns the statistics as a plain dict (e.g. for JSON)
+    def report(self):
+
+        return {
+            'makeMoves': self.makeMoves,
+            'undoMoves': self.undoMoves,
+            'isValidMoves': self.isValidMoves,
+            'maxDepth': self.maxDepth,
+            'depthHistogram': dict(sorted(self.depthHistogram.items())),
+            'branchingHistogram': dict(sorted(self.branchingHistogram.items())),
+            'meanBranching': self.meanBranching(),
+            'selections': self.selections,
+            'selectSeconds': self.selectSeconds,
+        }
+
+# raised by a budgeted search that ran out of time or nodes, or was cancelled
+# the board has already been put back in its original state when this is raised
+#   reason - 'time', 'nodes' or 'cancelled'
+#   nodes / seconds / maxDepth - how far the search got before it stopped
+class SearchInterrupted(Exception):
+
+    def __init__(self, reason, nodes, seconds, maxDepth):
+        super().__init__('search stopped (' + reason + ') after ' + str(nodes) + ' nodes in ' + '%.3f' % seconds + 's')
+        self.reason = reason
+        self.nodes = nodes
+        self.seconds = seconds
+        self.maxDepth = maxDepth
+
+
+# limits a search to a number of seconds and/or a number of nodes (moves made), and lets another
+# thread cancel it with cancel()
+# the clock is only read every checkEvery nodes, so an unbudgeted search pays nothing and a budgeted one very little
+# progress, if given, is called as progress(budget, depth) at every check, e.g. to report how far the search got
+class Budget:
+
+    ##########################################
+    ####   Constructor
+    ##########################################
+    def __init__(self, seconds=None, nodes=None, progress=None, checkEvery=256):
+        self.seconds = seconds
+        self.maxNodes = nodes
+        self.progress = progress
+        self.checkEvery = checkEvery
+        self.cancelled = threading.Event()
+        self.start()
+
+    # resets the clock, the node count, and a cancel, so the same budget can be given to the next search
+    def start(self):
+        self.cancelled.clear()
+        self.startTime = time.perf_counter()
+        self.nodes = 0
+        self.maxDepth = 0
+        self.nextCheck = self.checkEvery if self.maxNodes is None else min(self.checkEvery, self.maxNodes)
+
+    # stops the search at its next check; safe to call from any thread
+    # (the next start() clears it, so cancel a search once it is running)
+    def cancel(self):
+        self.cancelled.set()
+
+    ##########################################
+    ####   Checking
+    ##########################################
+
+    def elapsed(self):
+        return time.perf_counter() - self.startTime
+
+
+    # called by the search when nodes reaches nextCheck
+    # returns the reason the search has to stop, or None to keep going
+    def check(self, depth):
+
+        if depth > self.maxDepth:
+            self.maxDepth = depth
+        if self.progress is not None:
+            self.progress(self, depth)
+
+        self.nextCheck = self.nodes + self.checkEvery
+        if self.maxNodes is not None:
+            if self.nodes >= self.maxNodes:
+                return 'nodes'
+            self.nextCheck = min(self.nextCheck, self.maxNodes)
+        if self.cancelled.is_set():
+            return 'cancelled'
+        if self.seconds is not None and self.elapsed() >= self.seconds:
+            return 'time'
+        return None
+
+
+    def interrupted(self, reason):
+        return SearchInterrupted(reason, self.nodes, self.elapsed(), self.maxDepth)
+
+
 class Solver:
     ##########################################
     ####   Constructor
@@ -194,24 +1060,828 @@ class Solver:
     # state if a solution does not exist)
 
     # returns True if a solution exists and False if one does not
-    def solveBoard(self, board):
+
+    # with a Budget the search raises SearchInterrupted once the budget is used up or cancelled, after
+    # putting the board back in its original state
+    def solveBoard(self, board, budget=None):
+
+        if budget is not None:
+            budget.start()
+        return self.search(board, budget, 0)
+
+
+    # depth is the number of moves the search has made above this call
+    def search(self, board, budget, depth):
 
         if not (board.unsolvedSpaces):
             return True
         
         constrainedSpaces = board.getMostConstrainedUnsolvedSpace()
 
-        for j in range(1, board.n2 + 1):
-            if board.isValidMove(constrainedSpaces, j):
-                board.makeMove(constrainedSpaces, j)
-                availableSolutions = self.solveBoard(board)
-                if availableSolutions == True:
-                    return availableSolutions
-                else:
+        # the board hands out the values that are still valid, in the order to try them
+        for j in board.getValidValues(constrainedSpaces):
+            board.makeMove(constrainedSpaces, j)
+            if budget is not None:
+                budget.nodes += 1
+                if budget.nodes >= budget.nextCheck:
+                    reason = budget.check(depth + 1)
+                    if reason is not None:
+                        board.undoMove(constrainedSpaces, j)
+                        raise budget.interrupted(reason)
+                try:
+                    availableSolutions = self.search(board, budget, depth + 1)
+                except SearchInterrupted:
+                    # every level takes its own move back on the way out
                     board.undoMove(constrainedSpaces, j)
+                    raise
+            else:
+                availableSolutions = self.search(board, budget, depth + 1)
+            if availableSolutions == True:
+                return availableSolutions
+            else:
+                board.undoMove(constrainedSpaces, j)
+        else:
+            return False
+
+
+# the same search as Solver, but without recursion: the search state lives on an explicit stack
+# with one choice point per level, so boards of any order (49x49 and up) stay within Python's
+# recursion limit
+# it is not faster per node than Solver: the board's moves and space selection take nearly all of the time
+class IterativeSolver:
+    ##########################################
+    ####   Constructor
+    ##########################################
+
+    # rng (a random.Random) shuffles the values tried at each choice point, e.g. to build random full grids
+    # preferred (a dict from space to value, e.g. an earlier solution) is tried first wherever it is still valid
+    def __init__(self, rng=None, preferred=None):
+        self.rng = rng
+        self.preferred = preferred
+
+        # the last solution found by search, as a dict from space to value (kept even when the board is unwound)
+        self.solution = None
+
+    ##########################################
+    ####   Solver
+    ##########################################
+
+    # each choice point is a space, the values to try, and the index of the next value, held in three parallel
+    # stacks; the value before that index is the move currently on the board, so the stacks double as the undo trail
+
+    # upon completion, it will leave the board in the solved state (or original
+    # state if a solution does not exist)
+
+    # returns True if a solution exists and False if one does not
+    # raises SearchInterrupted (with the board in its original state) if budget runs out or is cancelled
+    def solveBoard(self, board, budget=None):
+
+        return self.search(board, 1, True, budget) == 1
+
+
+    # counts the solutions of the board, stopping as soon as limit of them have been found
+    # the board is always left in its original state
+
+    # returns the number of solutions found (at most limit)
+    def countSolutions(self, board, limit=2, budget=None):
+
+        return self.search(board, limit, False, budget)
+
+
+    # returns True if the board has exactly one solution, stopping at the second one
+    def hasUniqueSolution(self, board):
+
+        return self.countSolutions(board, 2) == 1
+
+
+    # searches until limit solutions have been found or the tree is exhausted
+    # keepSolution leaves the board on the last solution found instead of unwinding it
+    # budget (a Budget) bounds the search; when it stops the search the board is unwound and SearchInterrupted raised
+    def search(self, board, limit, keepSolution, budget=None):
+
+        if budget is not None:
+            budget.start()
+
+        # the board methods called at every node, looked up once
+        makeMove, undoMove, select = board.makeMove, board.undoMove, board.getMostConstrainedUnsolvedSpace
+        if self.rng is None and self.preferred is None:
+            getValues = board.getValidValues
         else:
+            getValues = lambda space: self.orderValues(board, space)
+
+        space = select()
+        if space is None:
+            self.solution = dict(board.board)
+            return 1
+
+        # the choice point being searched is kept in locals, and the ones above it on the stacks
+        found = 0
+        values, index = getValues(space), 0
+        spaces, valueLists, indices = [], [], []
+        while True:
+            # take back the value tried last time at this level
+            if index:
+                undoMove(space, values[index - 1])
+
+            # every value failed, so backtrack to the previous level
+            if index == len(values):
+                if not spaces:
+                    return found
+                space, values, index = spaces.pop(), valueLists.pop(), indices.pop()
+                continue
+
+            makeMove(space, values[index])
+            index += 1
+
+            if budget is not None:
+                budget.nodes += 1
+                if budget.nodes >= budget.nextCheck:
+                    reason = budget.check(len(spaces) + 1)
+                    if reason is not None:
+                        spaces.append(space)
+                        valueLists.append(values)
+                        indices.append(index)
+                        self.unwind(board, spaces, valueLists, indices)
+                        raise budget.interrupted(reason)
+
+            nextSpace = select()
+            if nextSpace is None:
+                found += 1
+                self.solution = dict(board.board)
+                if found == limit:
+                    if not keepSolution:
+                        spaces.append(space)
+                        valueLists.append(values)
+                        indices.append(index)
+                        self.unwind(board, spaces, valueLists, indices)
+                    return found
+                # keep looking: the next pass takes this move back and tries the next value
+                continue
+
+            spaces.append(space)
+            valueLists.append(values)
+            indices.append(index)
+            space, values, index = nextSpace, getValues(nextSpace), 0
+
+
+    # the values to try at a choice point, in the order to try them
+    def orderValues(self, board, space):
+
+        values = board.getValidValues(space)
+        if self.rng is not None:
+            self.rng.shuffle(values)
+        if self.preferred is not None:
+            value = self.preferred.get(space)
+            if value in values and values[0] != value:
+                values.remove(value)
+                values.insert(0, value)
+        return values
+
+
+    # takes back every move still recorded on the stacks
+    def unwind(self, board, spaces, valueLists, indices):
+
+        while spaces:
+            space, values, index = spaces.pop(), valueLists.pop(), indices.pop()
+            if index > 0:
+                board.undoMove(space, values[index - 1])
+
+
+# backtracking with conflict-directed backjumping and nogood learning
+# when a subtree fails, the solver works out which earlier choices (space = value decisions) caused the failure:
+#   - a space with no valid values fails because of the decisions that hold each of its values in a peer
+#   - a space whose values all failed fails because of the union of the causes of each failure, minus its own choices
+# that set of decisions is a nogood: they can never all hold together, whatever else is on the board
+# nogoods of at most maxNogoodSize decisions are remembered and checked before every move, so the same failure
+# is not searched again elsewhere in the tree, and the search jumps straight back to the latest decision in the
+# cause instead of trying the other values of choices that had nothing to do with it
+# the store keeps at most maxNogoods nogoods, evicting the least recently used one
+#
+# the explanations rely on every filled space being a given or a decision, so this works on Board and BitBoard but
+# not on PropagatingBoard (whose deductions would have to be explained as well)
+class NogoodSolver:
+    ##########################################
+    ####   Constructor
+    ##########################################
+    def __init__(self, maxNogoods=10000, maxNogoodSize=10):
+        self.maxNogoods = maxNogoods
+        self.maxNogoodSize = maxNogoodSize
+        self.reset()
+
+    # forgets the nogoods (they only hold for the givens of the board they were learned on)
+    def reset(self):
+        self.nogoods = collections.OrderedDict()
+        self.watches = {}
+        self.decisions = {}
+
+        # search statistics for the last solveBoard call
+        self.nodes = 0
+        self.learned = 0
+        self.pruned = 0
+        self.evicted = 0
+        self.backjumps = 0
+
+    ##########################################
+    ####   Nogood Store
+    ##########################################
+
+    # remembers a nogood (a frozenset of (space, value) decisions), evicting the least recently used one if full
+    def learn(self, nogood):
+
+        if not nogood or len(nogood) > self.maxNogoodSize or nogood in self.nogoods:
+            return
+        self.nogoods[nogood] = None
+        for literal in nogood:
+            self.watches.setdefault(literal, []).append(nogood)
+        self.learned += 1
+
+        if len(self.nogoods) > self.maxNogoods:
+            oldest, _ = self.nogoods.popitem(last=False)
+            for literal in oldest:
+                self.watches[literal].remove(oldest)
+            self.evicted += 1
+
+
+    # returns a nogood that making the move would complete, or None if there is none
+    def violated(self, space, value):
+
+        decisions = self.decisions
+        for nogood in self.watches.get((space, value), ()):
+            for other, otherValue in nogood:
+                if other != space and decisions.get(other) != otherValue:
+                    break
+            else:
+                self.nogoods.move_to_end(nogood)
+                return nogood
+        return None
+
+    ##########################################
+    ####   Conflict Analysis
+    ##########################################
+
+    # the decisions that hold, in a peer of space, a value that no given already rules out for space
+    def blockers(self, board, space):
+
+        decided = {}
+        given = set()
+        r, c = space
+        for peer in self.peers[r * board.n2 + c]:
+            value = board.board.get(peer)
+            if value is None:
+                continue
+            if peer in self.decisions:
+                decided.setdefault(value, (peer, value))
+            else:
+                given.add(value)
+        return set(literal for value, literal in decided.items() if value not in given)
+
+    ##########################################
+    ####   Solver
+    ##########################################
+
+    # returns None once the board is solved, or the set of decisions that make it unsolvable from here
+    # the search runs on an explicit stack with one frame per decision, [space, values, index of the next value,
+    # conflict so far], so its depth is not bounded by Python's recursion limit
+    def search(self, board, budget):
+
+        decisions = self.decisions
+        space = board.getMostConstrainedUnsolvedSpace()
+        if space is None:
+            return None
+        frames = [[space, board.getValidValues(space), 0, self.blockers(board, space)]]
+
+        # the cause of the failure below the move on top of the stack, or None while the top frame has no move
+        # waiting to be taken back
+        cause = None
+        while True:
+            frame = frames[-1]
+            space, values, index, conflict = frame
+
+            if cause is not None:
+                value = values[index - 1]
+                del decisions[space]
+                board.undoMove(space, value)
+                if (space, value) not in cause:
+                    # the failure below did not depend on this choice, so neither will the other values
+                    self.backjumps += 1
+                    frames.pop()
+                    if not frames:
+                        return cause
+                    continue
+                conflict.update(cause)
+                conflict.discard((space, value))
+                cause = None
+
+            while index < len(values):
+                value = values[index]
+                index += 1
+                nogood = self.violated(space, value)
+                if nogood is None:
+                    break
+                self.pruned += 1
+                conflict.update(nogood)
+                conflict.discard((space, value))
+            else:
+                # every value failed
+                cause = frozenset(conflict)
+                self.learn(cause)
+                frames.pop()
+                if not frames:
+                    return cause
+                continue
+            frame[2] = index
+
+            self.nodes += 1
+            if budget is not None:
+                budget.nodes += 1
+                if budget.nodes >= budget.nextCheck:
+                    reason = budget.check(len(decisions))
+                    if reason is not None:
+                        raise budget.interrupted(reason)
+
+            board.makeMove(space, value)
+            decisions[space] = value
+            space = board.getMostConstrainedUnsolvedSpace()
+            if space is None:
+                return None
+            frames.append([space, board.getValidValues(space), 0, self.blockers(board, space)])
+
+
+    # upon completion, it will leave the board in the solved state (or original
+    # state if a solution does not exist)
+
+    # returns True if a solution exists and False if one does not
+    # raises SearchInterrupted (with the board in its original state) if budget runs out or is cancelled
+    def solveBoard(self, board, budget=None):
+
+        if isinstance(board, PropagatingBoard):
+            raise Exception('NogoodSolver cannot explain the deductions of a PropagatingBoard, use a Board or BitBoard')
+
+        self.reset()
+        n2 = board.n2
+        self.peers = [[divmod(peer, n2) for peer in peers] for peers in BitBoard.getLayout(board.n)[3]]
+        if budget is not None:
+            budget.start()
+
+        try:
+            return self.search(board, budget) is None
+        except SearchInterrupted:
+            for space, value in reversed(list(self.decisions.items())):
+                board.undoMove(space, value)
+            self.decisions = {}
+            raise
+
+
+# solves the board as an exact cover problem with Knuth's Algorithm X using Dancing Links
+# every (space, value) pair that is still a valid move is a row of the matrix, and it covers
+# four columns: the space is filled, and value is used in its row, its col, and its box
+# the matrix is stored as flat lists of links (left, right, up, down, column) indexed by node
+class DLXSolver:
+    ##########################################
+    ####   Constructor
+    ##########################################
+    def __init__(self):
+        self.L = None
+        self.R = None
+        self.U = None
+        self.D = None
+        self.C = None
+        self.S = None
+        self.moves = None
+        self.solution = None
+        self.budget = None
+
+        # search statistics for the last solveBoard call
+        self.nodes = 0
+        self.backtracks = 0
+
+    ##########################################
+    ####   Matrix Construction
+    ##########################################
+
+    # builds the exact cover matrix for the constraints that the board has left to satisfy
+    def buildMatrix(self, board):
+
+        # node 0 is the root, followed by one header node per column
+        columns = {}
+        rows = []
+        for space in board.unsolvedSpaces:
+            box = board.spaceToBox(space[0], space[1])
+            for value in range(1, board.n2 + 1):
+                if board.isValidMove(space, value):
+                    keys = (('space', space), ('row', space[0], value), ('col', space[1], value), ('box', box, value))
+                    for key in keys:
+                        if key not in columns:
+                            columns[key] = len(columns) + 1
+                    rows.append((space, value, [columns[key] for key in keys]))
+
+        # a constraint that no valid move satisfies has no column yet, so add it as an empty column
+        # (the search then fails immediately instead of ignoring the constraint)
+        required = set(('space', space) for space in board.unsolvedSpaces)
+        for unit in range(board.n2):
+            for value in range(1, board.n2 + 1):
+                required.update((('row', unit, value), ('col', unit, value), ('box', unit, value)))
+        for (row, col), value in board.board.items():
+            required.difference_update((('row', row, value), ('col', col, value), ('box', board.spaceToBox(row, col), value)))
+        for key in required:
+            if key not in columns:
+                columns[key] = len(columns) + 1
+
+        count = len(columns) + 1
+        self.L = [i - 1 for i in range(count)]
+        self.R = [i + 1 for i in range(count)]
+        self.L[0] = count - 1
+        self.R[count - 1] = 0
+        self.U = list(range(count))
+        self.D = list(range(count))
+        self.C = list(range(count))
+        self.S = [0] * count
+        self.moves = [None] * count
+
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        for space, value, cols in rows:
+            first = len(C)
+            for k, col in enumerate(cols):
+                node = first + k
+
+                # link the node into the bottom of its column
+                U.append(U[col])
+                D.append(col)
+                D[U[col]] = node
+                U[col] = node
+                C.append(col)
+                S[col] += 1
+
+                # link the node into its row
+                L.append(first + k - 1 if k > 0 else first + len(cols) - 1)
+                R.append(first + k + 1 if k < len(cols) - 1 else first)
+                self.moves.append((space, value))
+
+    ##########################################
+    ####   Dancing Links
+    ##########################################
+
+    # removes the column from the header list and every row that uses it from the other columns
+    def cover(self, col):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[col]] = R[col]
+        L[R[col]] = L[col]
+        i = D[col]
+        while i != col:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    # exactly reverses cover(col)
+    def uncover(self, col):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[col]
+        while i != col:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[col]] = col
+        L[R[col]] = col
+
+    # Algorithm X: always branches on the column with the fewest remaining rows
+    # returns True once every column is covered, leaving the chosen rows in self.solution
+    # the search runs on an explicit stack of the columns branched on (self.solution holds the row tried in each),
+    # so its depth is not bounded by Python's recursion limit however many spaces are empty
+    def search(self):
+
+        L, R, D, C, S = self.L, self.R, self.D, self.C, self.S
+        solution = self.solution
+        columns = []
+        descend = True
+        while True:
+            if descend:
+                if R[0] == 0:
+                    return True
+
+                col = R[0]
+                best = col
+                while col != 0:
+                    if S[col] < S[best]:
+                        best = col
+                        if S[best] == 0:
+                            break
+                    col = R[col]
+
+                if S[best] > 0:
+                    self.cover(best)
+                    columns.append(best)
+                    self.placeRow(D[best])
+                    continue
+
+            # the row on top of the stack failed (or no row is left for a column): take it back and try the
+            # next row of its column, backing up a level once the column runs out of rows
+            descend = False
+            while columns:
+                best = columns[-1]
+                row = solution.pop()
+                self.backtracks += 1
+                j = L[row]
+                while j != row:
+                    self.uncover(C[j])
+                    j = L[j]
+                row = D[row]
+                if row != best:
+                    self.placeRow(row)
+                    descend = True
+                    break
+                columns.pop()
+                self.uncover(best)
+            if not descend:
+                return False
+
+    # puts row on the solution and covers its other columns
+    def placeRow(self, row):
+
+        self.nodes += 1
+        budget = self.budget
+        if budget is not None:
+            budget.nodes += 1
+            if budget.nodes >= budget.nextCheck:
+                reason = budget.check(len(self.solution))
+                if reason is not None:
+                    raise budget.interrupted(reason)
+        self.solution.append(row)
+        R, C = self.R, self.C
+        j = R[row]
+        while j != row:
+            self.cover(C[j])
+            j = R[j]
+
+    ##########################################
+    ####   Solver
+    ##########################################
+
+    # fills board.board with the solution found by Algorithm X, making the moves through the board
+    # the board is left untouched if a solution does not exist
+
+    # returns True if a solution exists and False if one does not
+    # raises SearchInterrupted if budget runs out or is cancelled; the board has not been touched by then
+    # (the matrix is left half covered, but it is rebuilt by the next solve)
+    def solveBoard(self, board, budget=None):
+
+        self.buildMatrix(board)
+        self.solution = []
+        self.nodes = 0
+        self.backtracks = 0
+        self.budget = budget
+        if budget is not None:
+            budget.start()
+        if not self.search():
+            return False
+
+        applySolution(board, dict(self.moves[row] for row in self.solution))
+        return True
+
+
+##########################################
+####   Parsing
+##########################################
+
+# maps the characters of the compact 81 character format straight to their values ('.' and '0' are empty)
+COMPACT = bytes.maketrans(b'.0123456789', bytes([0]) + bytes(range(10)))
+
+# parses one puzzle line into a flat list of n^4 ints, where 0 marks an empty space
+# the values may be separated by commas or whitespace; 9x9 puzzles may also be 81 characters with no separator
+def parsePuzzleLine(line):
+
+    if isinstance(line, str):
+        line = line.encode()
+    line = line.strip()
+    if b',' in line:
+        return [int(token) if token and token != b'.' else 0 for token in line.split(b',')]
+    tokens = line.split()
+    if len(tokens) > 1:
+        return [int(token) if token != b'.' else 0 for token in tokens]
+    return list(line.translate(COMPACT))
+
+
+# yields the flat list of values of every puzzle in a file with one puzzle per line
+# the file is read as bytes so each compact line is decoded by a single translate
+def readPuzzleFile(path):
+
+    with open(path, 'rb') as puzzleFile:
+        for line in puzzleFile:
+            if line.strip():
+                yield parsePuzzleLine(line)
+
+
+# makes the moves of a solution (a dict from space to value) on the board
+# spaces that an earlier move already filled (e.g. by propagation) are skipped
+def applySolution(board, solution):
+
+    for space in sorted(solution):
+        if space in board.unsolvedSpaces:
+            board.makeMove(space, solution[space])
+
+
+##########################################
+####   Parallel Search
+##########################################
+
+# the board and solver class each worker process searches with (set once per worker by initSubtreeWorker)
+subtreeBoard = None
+subtreeSolverClass = None
+
+def initSubtreeWorker(board, solverClass):
+    global subtreeBoard, subtreeSolverClass
+    subtreeBoard = board
+    subtreeSolverClass = solverClass
+
+# makes the prefix of moves and searches the subtree under it
+# returns the solved spaces as a dict, or None if the subtree has no solution
+def solveSubtree(prefix):
+
+    board = subtreeBoard
+    unsolved = set(board.unsolvedSpaces)
+    for space, value in prefix:
+        board.makeMove(space, value)
+
+    if subtreeSolverClass().solveBoard(board):
+        return {space: board.board[space] for space in unsolved}
+
+    for space, value in reversed(prefix):
+        board.undoMove(space, value)
+    return None
+
+
+# splits the search tree at its first few most-constrained-space choices and searches the subtrees
+# in a pool of worker processes; the first worker to find a solution wins and the pool is terminated
+class ParallelSolver:
+    ##########################################
+    ####   Constructor
+    ##########################################
+
+    # subtreesPerWorker controls how finely the tree is split, and maxSplitDepth how many choices deep it may go
+    def __init__(self, workers=None, solverClass=IterativeSolver, subtreesPerWorker=4, maxSplitDepth=4):
+        self.workers = workers
+        self.solverClass = solverClass
+        self.subtreesPerWorker = subtreesPerWorker
+        self.maxSplitDepth = maxSplitDepth
+
+    ##########################################
+    ####   Solver
+    ##########################################
+
+    # expands the choices breadth first until there are enough subtrees to keep every worker busy
+    # returns the list of move prefixes, one per subtree, or True if the board was solved while splitting
+    # (in which case the solving moves are left on the board)
+    def split(self, board, target):
+
+        frontier = [[]]
+        for _ in range(self.maxSplitDepth):
+            if len(frontier) >= target:
+                break
+
+            children = []
+            for prefix in frontier:
+                for space, value in prefix:
+                    board.makeMove(space, value)
+
+                space = board.getMostConstrainedUnsolvedSpace()
+                if space is None:
+                    return True
+                for value in board.getValidValues(space):
+                    children.append(prefix + [(space, value)])
+
+                for space, value in reversed(prefix):
+                    board.undoMove(space, value)
+            frontier = children
+        return frontier
+
+
+    # upon completion, it will leave the board in the solved state (or original
+    # state if a solution does not exist)
+
+    # returns True if a solution exists and False if one does not
+    def solveBoard(self, board):
+
+        workers = self.workers or multiprocessing.cpu_count()
+        frontier = self.split(board, workers * self.subtreesPerWorker)
+        if frontier is True:
+            return True
+        if not frontier:
             return False
 
+        with multiprocessing.Pool(workers, initializer=initSubtreeWorker, initargs=(board, self.solverClass)) as pool:
+            for solution in pool.imap_unordered(solveSubtree, frontier):
+                if solution is not None:
+                    pool.terminate()
+                    applySolution(board, solution)
+                    return True
+        return False
+
+
+##########################################
+####   Editing Sessions
+##########################################
+
+# holds a puzzle and its current solution while cells are edited one at a time, e.g. for an interactive checker
+# an edit only re-solves when it has to:
+#   clearCell             - removing a value cannot break the current solution, so it still holds
+#   setCell               - if the value matches the current solution, that solution still holds
+# otherwise the puzzle is searched again with the current solution as the first value to try at every space,
+# so only the part of the grid the edit actually affects is searched
+# the board stays in the puzzle state (givens and entries only); undoMove must not depend on the order of the moves,
+# so this works on Board, BitBoard, and BucketBoard but not on PropagatingBoard
+class SolvingSession:
+    ##########################################
+    ####   Constructor
+    ##########################################
+
+    # the filled spaces of board are the givens, which cannot be edited
+    # budget (a Budget) bounds every search; a search that runs out raises SearchInterrupted with the edit undone
+    def __init__(self, board, budget=None):
+        if isinstance(board, PropagatingBoard):
+            raise Exception('SolvingSession needs a board whose moves can be undone in any order, use a Board or BitBoard')
+        self.board = board
+        self.budget = budget
+        self.givens = set(board.board)
+        self.solution = None
+        self.resolve()
+
+    ##########################################
+    ####   Editing
+    ##########################################
+
+    # puts value in space (replacing the entry already there)
+    # returns True if the puzzle is still solvable
+    def setCell(self, space, value):
+
+        board = self.board
+        if space in self.givens:
+            raise Exception('Space ' + str(space) + ' is a given and cannot be edited')
+        old = board.board.get(space)
+        if old == value:
+            return self.solvable()
+        if old is not None:
+            board.undoMove(space, old)
+        if not board.isValidMove(space, value):
+            if old is not None:
+                board.makeMove(space, old)
+            raise Exception(str(value) + ' cannot go in space ' + str(space) + ', it is already in its row, col, or box')
+
+        board.makeMove(space, value)
+        if self.solution is not None and self.solution.get(space) == value:
+            return True
+        try:
+            return self.resolve()
+        except SearchInterrupted:
+            board.undoMove(space, value)
+            if old is not None:
+                board.makeMove(space, old)
+            raise
+
+
+    # removes the entry in space
+    # returns True if the puzzle is still solvable
+    def clearCell(self, space):
+
+        board = self.board
+        if space in self.givens:
+            raise Exception('Space ' + str(space) + ' is a given and cannot be edited')
+        value = board.board.get(space)
+        if value is None or self.solution is not None:
+            # one entry fewer is never harder to solve
+            if value is not None:
+                board.undoMove(space, value)
+            return self.solvable()
+
+        board.undoMove(space, value)
+        try:
+            return self.resolve()
+        except SearchInterrupted:
+            board.makeMove(space, value)
+            raise
+
+    ##########################################
+    ####   Solving
+    ##########################################
+
+    def solvable(self):
+        return self.solution is not None
+
+
+    # searches the current puzzle again, trying the last solution first
+    # returns True if the puzzle is solvable
+    def resolve(self):
+
+        solver = IterativeSolver(preferred=self.solution)
+        self.solution = solver.solution if solver.search(self.board, 1, False, self.budget) else None
+        return self.solution is not None
+
 
 if __name__ == "__main__":
     # change this to the input file that you'd like to test
@@ -0,0 +1,219 @@
+#!/usr/bin/python3
+# solves large packs of puzzles across a pool of worker processes
+#
+# the input is either a file with one puzzle per line, or a directory of CSV files laid out like example.csv
+# a puzzle line holds n^4 values (81, 256, 625, ...) separated by commas or whitespace; 9x9 puzzles can also
+# be written as 81 characters with no separator. empty spaces are '', '0', or '.'
+# lines are parsed with a2.parsePuzzleLine and workers build their boards with Board.fromValues
+# with --vectorized every chunk is propagated at once with NumPy (see vectorized.py) and only the puzzles that
+# still need branching are built as boards
+#
+# solutions are written one per line, in input order, in the same style as the input line
+# (comma separated for CSV directories). a puzzle without a solution is written back unchanged, and so is
+# a puzzle that runs past --time-limit or --max-nodes, so one pathological puzzle cannot stall a worker
+#
+# usage: python3 batch.py puzzles.txt -o solutions.txt --workers 8
+#        python3 batch.py puzzles.txt -o solutions.txt --vectorized --board bitmask
+
+import argparse
+import collections
+import csv
+import multiprocessing
+import os
+import sys
+
+import a2
+
+BOARDS = {'basic': a2.Board, 'bitmask': a2.BitBoard, 'bucket': a2.BucketBoard, 'propagating': a2.PropagatingBoard}
+SOLVERS = {'backtracking': a2.Solver, 'iterative': a2.IterativeSolver, 'nogood': a2.NogoodSolver, 'dlx': a2.DLXSolver}
+
+##########################################
+####   Parsing
+##########################################
+
+# parses one puzzle line (str or bytes) into its flat list of values
+# returns (values, separator) where separator is how the line was written, so the solution can be written the same way
+def parsePuzzle(line):
+
+    if isinstance(line, str):
+        line = line.encode()
+    line = line.strip()
+    if b',' in line:
+        separator = ','
+    elif len(line.split()) > 1:
+        separator = ' '
+    else:
+        separator = ''
+    return a2.parsePuzzleLine(line), separator
+
+
+# yields (values, separator) for every puzzle in a puzzle file or a directory of CSV files
+def readPuzzles(path):
+
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.csv'):
+                with open(os.path.join(path, name)) as csvFile:
+                    rows = list(csv.reader(csvFile))
+                yield [int(item) if item != '' else 0 for row in rows for item in row], ','
+    else:
+        with open(path, 'rb') as puzzleFile:
+            for line in puzzleFile:
+                if line.strip():
+                    yield parsePuzzle(line)
+
+
+# writes the board back out as a single line
+def formatBoard(board, separator):
+
+    rows = [[str(board.board[(r, c)]) if (r, c) in board.board else '' for c in range(board.n2)] for r in range(board.n2)]
+    return formatRows(rows, separator)
+
+
+# writes rows of values ('' for an empty space) as a single line
+def formatRows(rows, separator):
+
+    empty = '.' if separator == '' else '' if separator == ',' else '0'
+    return separator.join(value if value != '' else empty for row in rows for value in row)
+
+
+# writes a flat list of values (0 for an empty space) as a single line
+def formatValues(values, separator):
+
+    return formatRows([[str(value) if value else '' for value in values]], separator)
+
+
+##########################################
+####   Workers
+##########################################
+
+boardClass = None
+solverClass = None
+timeLimit = None
+maxNodes = None
+solveBatch = None
+
+# runs once in every worker process
+def initWorker(boardName, solverName, seconds=None, nodes=None, vectorize=False):
+
+    global boardClass, solverClass, timeLimit, maxNodes, solveBatch
+    boardClass = BOARDS[boardName]
+    solverClass = SOLVERS[solverName]
+    timeLimit = seconds
+    maxNodes = nodes
+    if vectorize:
+        # NumPy is only needed with --vectorized
+        import vectorized
+        solveBatch = vectorized.solveBatch
+
+
+# solves a chunk of puzzles, returning (line, status) pairs in the same order
+# status is 'solved', 'unsolvable', or the SearchInterrupted reason for a puzzle that ran out of budget
+def solveChunk(chunk):
+
+    solver = solverClass()
+    budget = a2.Budget(timeLimit, maxNodes) if timeLimit is not None or maxNodes is not None else None
+    if solveBatch is not None:
+        solutions = solveBatch([values for values, _ in chunk], boardClass, solverClass, budget)
+        return [(formatValues(values, separator), status) for (values, status), (_, separator) in zip(solutions, chunk)]
+
+    results = []
+    for values, separator in chunk:
+        board = boardClass.fromValues(values)
+        try:
+            status = 'solved' if solver.solveBoard(board, budget) else 'unsolvable'
+        except a2.SearchInterrupted as interrupted:
+            status = interrupted.reason
+        # the board may hold deductions made while loading, so an unsolved puzzle is written from its own values
+        results.append((formatBoard(board, separator) if status == 'solved' else formatValues(values, separator), status))
+    return results
+
+
+# groups the puzzles into lists of at most size puzzles
+def chunked(puzzles, size):
+
+    chunk = []
+    for puzzle in puzzles:
+        chunk.append(puzzle)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+##########################################
+####   Batch Solving
+##########################################
+
+# solves every puzzle in path and writes the solutions to output as soon as they are ready, in input order
+# at most maxInFlight chunks are queued at once, so memory stays flat however large the input is
+# timeLimit (seconds) and maxNodes bound the search on every puzzle
+# returns (number of puzzles, number solved, number that ran out of budget)
+# vectorize propagates every chunk with NumPy first (larger chunks suit it better)
+def solveAll(path, output, boardName='propagating', solverName='backtracking', workers=None, chunkSize=64, maxInFlight=None,
+             timeLimit=None, maxNodes=None, vectorize=False):
+
+    workers = workers or os.cpu_count() or 1
+    maxInFlight = maxInFlight or workers * 4
+    total = solved = interrupted = 0
+
+    initargs = (boardName, solverName, timeLimit, maxNodes, vectorize)
+    with multiprocessing.Pool(workers, initializer=initWorker, initargs=initargs) as pool:
+        pending = collections.deque()
+
+        def writeNext():
+            nonlocal total, solved, interrupted
+            for line, status in pending.popleft().get():
+                output.write(line + '\n')
+                total += 1
+                solved += status == 'solved'
+                interrupted += status not in ('solved', 'unsolvable')
+
+        for chunk in chunked(readPuzzles(path), chunkSize):
+            pending.append(pool.apply_async(solveChunk, (chunk,)))
+            if len(pending) >= maxInFlight:
+                writeNext()
+        while pending:
+            writeNext()
+
+    return total, solved, interrupted
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Solve a file of one-line puzzles or a directory of CSV puzzles in parallel.')
+    parser.add_argument('input', help='puzzle file (one puzzle per line) or directory of CSV puzzles')
+    parser.add_argument('-o', '--output', help='file to write the solutions to (default: stdout)')
+    parser.add_argument('--board', choices=sorted(BOARDS), default=None,
+                        help='default: propagating, or bitmask with --solver nogood')
+    parser.add_argument('--solver', choices=sorted(SOLVERS), default='backtracking')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: one per core)')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='puzzles sent to a worker at a time (default: 64, or 1024 with --vectorized)')
+    parser.add_argument('--time-limit', type=float, default=None, help='give up on a puzzle after this many seconds')
+    parser.add_argument('--max-nodes', type=int, default=None, help='give up on a puzzle after this many moves')
+    parser.add_argument('--vectorized', action='store_true',
+                        help='propagate each chunk with NumPy and only search the puzzles that are left (needs numpy)')
+    args = parser.parse_args()
+    # NogoodSolver cannot explain the deductions a PropagatingBoard makes on its own
+    if args.board is None:
+        args.board = 'bitmask' if args.solver == 'nogood' else 'propagating'
+    elif args.board == 'propagating' and args.solver == 'nogood':
+        parser.error('--solver nogood needs a board without propagation (--board basic, bitmask, or bucket)')
+    chunkSize = args.chunk_size or (1024 if args.vectorized else 64)
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        total, solved, interrupted = solveAll(args.input, output, args.board, args.solver, args.workers, chunkSize,
+                                              timeLimit=args.time_limit, maxNodes=args.max_nodes, vectorize=args.vectorized)
+    finally:
+        if args.output:
+            output.close()
+    print('solved', solved, 'of', total, 'puzzles', file=sys.stderr)
+    if interrupted:
+        print(interrupted, 'puzzles ran out of budget', file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
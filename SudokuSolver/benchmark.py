@@ -0,0 +1,206 @@
+#!/usr/bin/python3
+# benchmarks the solvers over the example puzzles and a generated corpus
+#
+# for every backend (a board class paired with a solver class) and every puzzle it records the load time,
+# the solve time, the search nodes (moves made), the backtracks (moves taken back), the search statistics
+# from SearchStats, and the peak memory of the solve, then summarizes each backend with totals and time percentiles
+# the solve is timed with nothing attached to the board; the statistics and the memory come from separate runs
+# the results are written as JSON so two runs can be diffed
+#
+# usage: python3 benchmark.py --generate 200 -o before.json
+#        python3 benchmark.py --backends iterative-propagating dlx --json after.json
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import a2
+import batch
+import generator
+
+BACKENDS = {
+    'recursive-basic': (a2.Board, a2.Solver),
+    'recursive-bitmask': (a2.BitBoard, a2.Solver),
+    'recursive-propagating': (a2.PropagatingBoard, a2.Solver),
+    'iterative-bitmask': (a2.BitBoard, a2.IterativeSolver),
+    'iterative-bucket': (a2.BucketBoard, a2.IterativeSolver),
+    'iterative-propagating': (a2.PropagatingBoard, a2.IterativeSolver),
+    'nogood-bitmask': (a2.BitBoard, a2.NogoodSolver),
+    'dlx': (a2.BitBoard, a2.DLXSolver),
+}
+
+EXAMPLES = ['example.csv', 'harder_example.csv', 'very_hard_example.csv']
+
+
+##########################################
+####   Measuring
+##########################################
+
+# solves one puzzle once with nothing attached to the board, returning its status and times
+# every solver gets the node limit as an a2.Budget, so a puzzle that runs out of nodes stops the same way on
+# every backend
+def runOnce(boardClass, solverClass, values, maxNodes):
+
+    start = time.perf_counter()
+    board = boardClass.fromValues(values)
+    loaded = time.perf_counter()
+
+    solver = solverClass()
+    try:
+        solved = solver.solveBoard(board, a2.Budget(nodes=maxNodes))
+        status = 'solved' if solved else 'unsolvable'
+    except a2.SearchInterrupted:
+        status = 'node limit'
+    end = time.perf_counter()
+
+    result = {'status': status, 'loadSeconds': loaded - start, 'solveSeconds': end - loaded}
+    if solverClass is a2.DLXSolver:
+        # DLX searches its own matrix and only touches the board to write the solution
+        result.update({'nodes': solver.nodes, 'backtracks': solver.backtracks})
+    return result
+
+
+# solves the puzzle a second time with SearchStats attached, so its wrappers are not part of the timed run
+def searchCounts(boardClass, solverClass, values, maxNodes):
+
+    board = boardClass.fromValues(values)
+    stats = a2.SearchStats().attach(board)
+    try:
+        solverClass().solveBoard(board, a2.Budget(nodes=maxNodes))
+    except a2.SearchInterrupted:
+        pass
+    return {'nodes': stats.makeMoves, 'backtracks': stats.undoMoves, 'maxDepth': stats.maxDepth,
+            'meanBranching': stats.meanBranching(), 'selectSeconds': stats.selectSeconds,
+            'isValidMoves': stats.isValidMoves}
+
+
+# solves the puzzle a second time under tracemalloc to get the peak memory without slowing the timed run
+def peakMemory(boardClass, solverClass, values, maxNodes):
+
+    tracemalloc.start()
+    try:
+        runOnce(boardClass, solverClass, values, maxNodes)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# returns the value below which fraction of the sorted values fall (nearest rank)
+def percentile(sortedValues, fraction):
+
+    if not sortedValues:
+        return None
+    index = min(len(sortedValues) - 1, max(0, int(round(fraction * len(sortedValues))) - 1))
+    return sortedValues[index]
+
+
+def summarize(results):
+
+    times = sorted(result['solveSeconds'] for result in results)
+    return {
+        'puzzles': len(results),
+        'solved': sum(result['status'] == 'solved' for result in results),
+        'nodeLimit': sum(result['status'] == 'node limit' for result in results),
+        'totalSeconds': sum(times),
+        'totalLoadSeconds': sum(result['loadSeconds'] for result in results),
+        'totalNodes': sum(result['nodes'] for result in results),
+        'totalBacktracks': sum(result['backtracks'] for result in results),
+        'totalSelectSeconds': sum(result.get('selectSeconds', 0.0) for result in results),
+        'maxPeakBytes': max((result['peakBytes'] for result in results), default=0),
+        'p50Seconds': percentile(times, 0.50),
+        'p90Seconds': percentile(times, 0.90),
+        'p99Seconds': percentile(times, 0.99),
+        'maxSeconds': times[-1] if times else None,
+    }
+
+
+##########################################
+####   Running
+##########################################
+
+# returns a list of (name, values) for the example files, the corpus file, and the generated puzzles
+def loadPuzzles(examples, corpus, generate, order, seed):
+
+    puzzles = []
+    for filename in examples:
+        with open(filename) as csvFile:
+            puzzles.append((os.path.basename(filename), rowsToValues(csv.reader(csvFile))))
+    if corpus:
+        for index, (values, _) in enumerate(batch.readPuzzles(corpus)):
+            puzzles.append(('corpus-%d' % index, values))
+    if generate:
+        for index, (rows, _) in enumerate(generator.generatePuzzles(order, generate, seed=seed)):
+            puzzles.append(('generated-%d' % index, rowsToValues(rows)))
+    return puzzles
+
+
+def rowsToValues(rows):
+
+    return [int(item) if item != '' else 0 for row in rows for item in row]
+
+
+def runBenchmark(backends, puzzles, maxNodes, memory=True, log=None):
+
+    report = {}
+    for name in backends:
+        boardClass, solverClass = BACKENDS[name]
+        results = []
+        for puzzleName, values in puzzles:
+            result = runOnce(boardClass, solverClass, values, maxNodes)
+            result['puzzle'] = puzzleName
+            if solverClass is not a2.DLXSolver:
+                result.update(searchCounts(boardClass, solverClass, values, maxNodes))
+            # puzzles that ran out of nodes are not run again for memory, since that is the slow case
+            measure = memory and result['status'] != 'node limit'
+            result['peakBytes'] = peakMemory(boardClass, solverClass, values, maxNodes) if measure else 0
+            results.append(result)
+            if log:
+                print('%-22s %-24s %-10s %9.4fs %8d nodes %8d backtracks' % (name, puzzleName, result['status'],
+                      result['solveSeconds'], result['nodes'], result['backtracks']), file=log)
+        report[name] = {'summary': summarize(results), 'puzzles': results}
+    return report
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Benchmark the sudoku solvers.')
+    parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument('--examples', nargs='*', default=EXAMPLES, help='CSV puzzles to include (default: the three examples)')
+    parser.add_argument('--corpus', help='file with one puzzle per line to include')
+    parser.add_argument('--generate', type=int, default=0, help='number of puzzles to generate and include')
+    parser.add_argument('--order', type=int, default=3, help='order of the generated puzzles')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the generated puzzles, so runs are comparable')
+    parser.add_argument('--max-nodes', type=int, default=50000, help='give up on a puzzle after this many moves')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('-o', '--json', help='file to write the JSON report to (default: stdout)')
+    args = parser.parse_args()
+
+    puzzles = loadPuzzles(args.examples, args.corpus, args.generate, args.order, args.seed)
+    report = {
+        'python': platform.python_version(),
+        'maxNodes': args.max_nodes,
+        'backends': runBenchmark(args.backends, puzzles, args.max_nodes, not args.no_memory, sys.stderr),
+    }
+
+    for name, result in report['backends'].items():
+        summary = result['summary']
+        print('%-22s solved %d/%d  total %.3fs  p50 %.4fs  p90 %.4fs  p99 %.4fs  nodes %d  backtracks %d  peak %d KiB' % (
+              name, summary['solved'], summary['puzzles'], summary['totalSeconds'], summary['p50Seconds'],
+              summary['p90Seconds'], summary['p99Seconds'], summary['totalNodes'], summary['totalBacktracks'],
+              summary['maxPeakBytes'] // 1024), file=sys.stderr)
+
+    if args.json:
+        with open(args.json, 'w') as jsonFile:
+            json.dump(report, jsonFile, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+# caches solutions by the canonical form of the puzzle, so a puzzle that is the same as one solved before up to
+# digit relabeling, row/col swaps within a band/stack, band/stack swaps, and transposition is not solved again
+#
+# the canonical form is best effort: rows and cols are put in order by keys that do not change under those
+# symmetries, ties are broken by trying the tied orders (up to maxOrders of them) and keeping the smallest
+# relabeled grid, and the smaller of the two orientations wins. most equivalent puzzles get the same form, and
+# a puzzle always maps back exactly, so a hit can never give a wrong solution
+#
+# usage: solver = cache.CachedSolver(a2.IterativeSolver(), cache.SolutionCache('solutions.cache'))
+#        solver.solveBoard(board)
+#        solver.cache.save()
+
+import collections
+import itertools
+import os
+import pickle
+
+import a2
+
+##########################################
+####   Canonical Form
+##########################################
+
+# every order of items that keeps items with different keys sorted and permutes the ones with equal keys
+def tiedOrders(items, key):
+
+    groups = [list(group) for _, group in itertools.groupby(sorted(items, key=key), key=key)]
+    for choice in itertools.product(*[itertools.permutations(group) for group in groups]):
+        yield [item for group in choice for item in group]
+
+
+# the orders of the lines (rows of grid) that sort the bands and the lines in each band by their keys
+def lineOrders(grid, n, maxOrders):
+
+    frequency = collections.Counter(value for line in grid for value in line if value)
+
+    # a line is described by how often each of its digits is used on the whole grid, per stack
+    # (sorted, so the order of the stacks and of the cols inside them does not matter)
+    def lineKey(line):
+        return tuple(sorted(tuple(sorted(frequency[value] for value in grid[line][s * n:(s + 1) * n] if value))
+                            for s in range(n)))
+
+    def bandKey(band):
+        return tuple(sorted(lineKey(line) for line in range(band * n, (band + 1) * n)))
+
+    orders = []
+    for bands in tiedOrders(range(n), bandKey):
+        inBands = [tiedOrders(range(band * n, (band + 1) * n), lineKey) for band in bands]
+        for lines in itertools.product(*inBands):
+            orders.append([line for band in lines for line in band])
+            if len(orders) == maxOrders:
+                return orders
+    return orders
+
+
+# relabels the digits of the rows and cols of grid taken in the given orders by first appearance
+# returns (values as bytes, relabeling from the original digit to the canonical one)
+def relabel(grid, rows, cols, n2):
+
+    labels = {}
+    values = bytearray()
+    for r in rows:
+        for c in cols:
+            value = grid[r][c]
+            if value and value not in labels:
+                labels[value] = len(labels) + 1
+            values.append(labels.get(value, 0))
+
+    # digits that are not on the grid get the remaining labels, so the relabeling can be undone
+    for value in range(1, n2 + 1):
+        if value not in labels:
+            labels[value] = len(labels) + 1
+    return bytes(values), labels
+
+
+# returns (key, transform) for the puzzle on board
+# key is the canonical form as bytes; transform is (transposed, rows, cols, labels), which toCanonical and
+# fromCanonical use to move solutions between the board and the canonical form
+def canonicalForm(board, maxOrders=64):
+
+    n, n2 = board.n, board.n2
+    grid = [[board.board.get((r, c), 0) for c in range(n2)] for r in range(n2)]
+    transposedGrid = [list(col) for col in zip(*grid)]
+
+    best = None
+    for transposed, oriented in ((False, grid), (True, transposedGrid)):
+        colGrid = transposedGrid if not transposed else grid
+        rowOrders = lineOrders(oriented, n, maxOrders)
+        colOrders = lineOrders(colGrid, n, max(1, maxOrders // len(rowOrders)))
+        for rows in rowOrders:
+            for cols in colOrders:
+                key, labels = relabel(oriented, rows, cols, n2)
+                if best is None or key < best[0]:
+                    best = (key, (transposed, rows, cols, labels))
+    return best
+
+
+# the board's space that holds canonical space (i, j)
+def originalSpace(transform, i, j):
+
+    transposed, rows, cols, _ = transform
+    return (cols[j], rows[i]) if transposed else (rows[i], cols[j])
+
+
+# maps a solution on the board (dict from space to value) to canonical values as bytes
+def toCanonical(solution, transform, n2):
+
+    labels = transform[3]
+    return bytes(labels[solution[originalSpace(transform, i, j)]] for i in range(n2) for j in range(n2))
+
+
+# maps canonical values back to a solution on the board (dict from space to value)
+def fromCanonical(values, transform, n2):
+
+    original = {label: value for value, label in transform[3].items()}
+    return {originalSpace(transform, i, j): original[values[i * n2 + j]] for i in range(n2) for j in range(n2)}
+
+
+##########################################
+####   Cache
+##########################################
+
+# a bounded map from canonical form to canonical solution (or None for a puzzle without one), evicting the least
+# recently used entry once it holds maxEntries; with a path it is loaded from that file and save() writes it back
+class SolutionCache:
+
+    ##########################################
+    ####   Constructor
+    ##########################################
+    def __init__(self, path=None, maxEntries=100000):
+        self.path = path
+        self.maxEntries = maxEntries
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as cacheFile:
+                self.entries = pickle.load(cacheFile)
+            while len(self.entries) > maxEntries:
+                self.entries.popitem(last=False)
+
+    ##########################################
+    ####   Lookup
+    ##########################################
+
+    # returns (found, solution)
+    def get(self, key):
+
+        if key not in self.entries:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return True, self.entries[key]
+
+
+    def put(self, key, solution):
+
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+
+    # writes the cache to its file (through a temporary file, so an interrupted save keeps the old cache)
+    def save(self):
+
+        if self.path is None:
+            return
+        temporary = self.path + '.tmp'
+        with open(temporary, 'wb') as cacheFile:
+            pickle.dump(self.entries, cacheFile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self.path)
+
+
+##########################################
+####   Solver
+##########################################
+
+# looks the puzzle up in the cache before solving it with solver, and stores what solver finds
+class CachedSolver:
+    ##########################################
+    ####   Constructor
+    ##########################################
+    def __init__(self, solver=None, cache=None, maxOrders=64):
+        self.solver = solver or a2.Solver()
+        self.cache = cache or SolutionCache()
+        self.maxOrders = maxOrders
+
+    ##########################################
+    ####   Solver
+    ##########################################
+
+    # on a hit the cached solution is mapped back onto the board and the solver is not run at all
+
+    # upon completion, it will leave the board in the solved state (or original
+    # state if a solution does not exist)
+
+    # returns True if a solution exists and False if one does not
+    def solveBoard(self, board, budget=None):
+
+        n2 = board.n2
+        key, transform = canonicalForm(board, self.maxOrders)
+        found, values = self.cache.get(key)
+        if found:
+            if values is None:
+                return False
+            a2.applySolution(board, fromCanonical(values, transform, n2))
+            return True
+
+        # a search that runs out of budget raises before anything is stored
+        if not self.solver.solveBoard(board, budget):
+            self.cache.put(key, None)
+            return False
+        self.cache.put(key, toCanonical(board.board, transform, n2))
+        return True
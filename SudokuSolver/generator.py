@@ -0,0 +1,205 @@
+#!/usr/bin/python3
+# generates puzzles with a unique solution
+#
+# every puzzle starts from a random full grid (a random solve of the empty board), and clues are removed in a
+# random order as long as the puzzle still has exactly one solution, until the target number of clues is reached or
+# no more clues can be removed
+#
+# the clues live on one BucketBoard that is loaded from the full grid once: a clue is removed with undoMove and put
+# back with makeMove. removing a clue keeps the solution unique exactly when no other value of its space leads to a
+# solution, so each of those values is tried with a search bounded by an a2.Budget. a search that runs out is
+# repeated once on a PropagatingBoard, and if that runs out too, the clue is kept
+#
+# difficulty bands:
+#   easy - the deductions in PropagatingBoard solve the puzzle without any guessing
+#   hard - the solver has to branch at least once
+#
+# usage: python3 generator.py --order 3 --count 1000 --clues 26 --band easy --format line -o puzzles.txt
+
+import argparse
+import csv
+import multiprocessing
+import os
+import random
+import sys
+
+import a2
+import batch
+
+BANDS = ('any', 'easy', 'hard')
+
+# nodes each search of a uniqueness check may take
+MAX_NODES = 50
+
+
+##########################################
+####   Generation
+##########################################
+
+# returns a random full grid of order n as a dict from space to value
+def randomGrid(n, rng):
+
+    n2 = n * n
+    board = a2.PropagatingBoard.fromValues([0] * (n2 * n2))
+    a2.IterativeSolver(rng).solveBoard(board)
+    return dict(board.board)
+
+
+# converts a dict from space to value into rows of strings, with '' for missing spaces
+def gridToRows(grid, n2):
+
+    return [[str(grid[(r, c)]) if (r, c) in grid else '' for c in range(n2)] for r in range(n2)]
+
+
+# converts a dict from space to value into the flat list of values Board.fromValues takes
+def gridToValues(grid, n2):
+
+    return [grid.get(divmod(i, n2), 0) for i in range(n2 * n2)]
+
+
+# returns True if no solution of the board puts another value than value in space, so the clue can be removed
+# board holds the clues with space already emptied, and is left that way
+# a search that runs out of budget counts as finding a solution, so the clue is kept
+def isRemovable(board, space, value, budget):
+
+    solver = a2.IterativeSolver()
+    check = None
+    for other in board.getValidValues(space):
+        if other == value:
+            continue
+
+        # a search on the board itself settles most values
+        if check is None:
+            board.makeMove(space, other)
+            try:
+                found = solver.countSolutions(board, 1, budget)
+            except a2.SearchInterrupted:
+                found = None
+            finally:
+                board.undoMove(space, other)
+            if found is None:
+                # the rest of the values are searched with propagation, on a board built once for this clue
+                check = a2.PropagatingBoard.fromValues(board.cells)
+            elif found:
+                return False
+            else:
+                continue
+
+        # propagation may already have ruled the value out (or filled the space)
+        if not check.isValidMove(space, other):
+            continue
+        check.makeMove(space, other)
+        try:
+            found = solver.countSolutions(check, 1, budget)
+        except a2.SearchInterrupted:
+            found = 1
+        finally:
+            check.undoMove(space, other)
+        if found:
+            return False
+    return True
+
+
+# returns the band the puzzle falls in ('easy' or 'hard')
+def difficulty(clues, n2):
+
+    board = a2.PropagatingBoard.fromValues(gridToValues(clues, n2))
+    return 'easy' if not board.unsolvedSpaces else 'hard'
+
+
+# removes clues from a random full grid while the solution stays unique
+# maxNodes bounds every search of a uniqueness check; a clue whose check runs out is kept
+# returns (rows, number of clues)
+def generatePuzzle(n, rng, targetClues=0, maxNodes=MAX_NODES):
+
+    n2 = n * n
+    grid = randomGrid(n, rng)
+    board = a2.BucketBoard.fromValues(gridToValues(grid, n2))
+    budget = a2.Budget(nodes=maxNodes)
+    spaces = list(grid)
+    rng.shuffle(spaces)
+
+    clues = len(spaces)
+    for space in spaces:
+        if clues <= targetClues:
+            break
+        value = grid[space]
+        board.undoMove(space, value)
+        if isRemovable(board, space, value, budget):
+            clues -= 1
+        else:
+            board.makeMove(space, value)
+
+    return gridToRows(board.board, n2), clues
+
+
+# keeps generating puzzles until one lands in the band
+def generateInBand(n, rng, targetClues=0, band='any', maxAttempts=100, maxNodes=MAX_NODES):
+
+    for _ in range(maxAttempts):
+        rows, count = generatePuzzle(n, rng, targetClues, maxNodes)
+        clues = {(r, c): int(value) for r, row in enumerate(rows) for c, value in enumerate(row) if value != ''}
+        if band == 'any' or difficulty(clues, n * n) == band:
+            return rows, count
+    raise Exception('No ' + band + ' puzzle found in ' + str(maxAttempts) + ' attempts')
+
+
+# pool task: generates the puzzle for one seed, so a run is reproducible whatever the number of workers
+def generateTask(task):
+
+    n, seed, targetClues, band, maxNodes = task
+    return generateInBand(n, random.Random(seed), targetClues, band, maxNodes=maxNodes)
+
+
+# yields count puzzles as (rows, number of clues), generated across a pool of worker processes
+def generatePuzzles(n, count, targetClues=0, band='any', workers=None, seed=None, maxNodes=MAX_NODES):
+
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    tasks = ((n, seed + i, targetClues, band, maxNodes) for i in range(count))
+    with multiprocessing.Pool(workers or os.cpu_count() or 1) as pool:
+        for puzzle in pool.imap(generateTask, tasks, chunksize=4):
+            yield puzzle
+
+
+##########################################
+####   Output
+##########################################
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Generate puzzles with a unique solution.')
+    parser.add_argument('--order', type=int, default=3, help='n for an n^2 x n^2 board (3 for 9x9, 4 for 16x16)')
+    parser.add_argument('--count', type=int, default=1)
+    parser.add_argument('--clues', type=int, default=0, help='stop removing clues at this many (default: as few as possible)')
+    parser.add_argument('--band', choices=BANDS, default='any')
+    parser.add_argument('--max-nodes', type=int, default=MAX_NODES,
+                        help='nodes each search of a uniqueness check may take before the clue is kept')
+    parser.add_argument('--format', choices=('csv', 'line'), default='csv',
+                        help='csv writes one file per puzzle in the layout loadSudoku reads, line writes one puzzle per line')
+    parser.add_argument('-o', '--output', help='directory for csv output, file for line output (default: stdout for line)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.format == 'csv':
+        directory = args.output or '.'
+        os.makedirs(directory, exist_ok=True)
+    else:
+        output = open(args.output, 'w') if args.output else sys.stdout
+    separator = '' if args.order <= 3 else ','
+
+    puzzles = generatePuzzles(args.order, args.count, args.clues, args.band, args.workers, args.seed, args.max_nodes)
+    for index, (rows, _) in enumerate(puzzles):
+        if args.format == 'csv':
+            with open(os.path.join(directory, 'puzzle_%06d.csv' % index), 'w', newline='') as csvFile:
+                csv.writer(csvFile, lineterminator='\n').writerows(rows)
+        else:
+            output.write(batch.formatRows(rows, separator) + '\n')
+            output.flush()
+
+    if args.format == 'line' and args.output:
+        output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+# solves many puzzles at once with NumPy
+#
+# the puzzles are loaded into one (batch, spaces, n2) boolean candidate tensor, and naked and hidden singles
+# (the unit deductions of PropagatingBoard) run on every puzzle at the same time as array operations until no
+# puzzle changes any more. most puzzles are solved by these deductions alone; only the ones that still need
+# branching are loaded into a board and handed to the scalar solver
+#
+# usage: import vectorized; results = vectorized.solveBatch(puzzles)   (puzzles are flat lists of values, 0 for empty)
+
+import numpy as np
+
+import a2
+
+##########################################
+####   Layout
+##########################################
+
+# for every order, the (3 * n2, spaces) membership matrix of the rows, cols, and boxes and the (spaces, spaces)
+# peer matrix, both as float32 so the deductions below are matrix products, built once per order
+layouts = {}
+
+def getLayout(n):
+
+    if n not in layouts:
+        n2 = n * n
+        spaces = n2 * n2
+        rowOf, colOf, boxOf, peers = a2.BitBoard.getLayout(n)
+        units = np.zeros((3 * n2, spaces), dtype=np.float32)
+        peerMatrix = np.zeros((spaces, spaces), dtype=np.float32)
+        for i in range(spaces):
+            units[rowOf[i], i] = units[n2 + colOf[i], i] = units[2 * n2 + boxOf[i], i] = 1
+            peerMatrix[i, peers[i]] = 1
+        layouts[n] = (units, peerMatrix)
+    return layouts[n]
+
+
+##########################################
+####   Propagation
+##########################################
+
+# turns a (batch, spaces) array of values into the (batch, spaces, n2) candidate tensor
+# a given has only its own value as a candidate, an empty space starts with every value
+def loadCandidates(values, n2):
+
+    if values.min() < 0 or values.max() > n2:
+        raise Exception('Every value must be between 1 and ' + str(n2) + ' (or 0 for an empty space)')
+    candidates = np.ones(values.shape + (n2,), dtype=bool)
+    given = values > 0
+    candidates[given] = np.eye(n2, dtype=bool)[values[given] - 1]
+    return candidates
+
+
+# applies naked and hidden singles to every puzzle until none of them changes
+# candidates is updated in place; returns a (batch,) array that is True for the puzzles found to have no solution
+def propagate(candidates, n):
+
+    units, peerMatrix = getLayout(n)
+    contradiction = np.zeros(len(candidates), dtype=bool)
+    active = np.arange(len(candidates))
+
+    while active.size:
+        before = candidates[active]
+        counts = before.sum(2)
+
+        # naked singles: a space with one candidate removes it from every peer
+        singles = (before & (counts == 1)[:, :, None]).astype(np.float32)
+        bad = (counts == 0).any(1) | (np.matmul(units, singles) > 1).any((1, 2))
+        after = before & ~(np.matmul(peerMatrix, singles) > 0)
+
+        # hidden singles: a value with one possible space left in a unit goes there
+        possible = np.matmul(units, after.astype(np.float32))
+        bad |= (possible == 0).any((1, 2))
+        hidden = after & (np.matmul(units.T, (possible == 1).astype(np.float32)) > 0)
+        hiddenCounts = hidden.sum(2)
+        bad |= (hiddenCounts > 1).any(1)
+        after = np.where((hiddenCounts > 0)[:, :, None], hidden, after)
+
+        changed = (after != before).any((1, 2))
+        candidates[active] = after
+        contradiction[active[bad]] = True
+        active = active[changed & ~bad]
+
+    return contradiction
+
+
+##########################################
+####   Solving
+##########################################
+
+# solves a list of puzzles (flat lists of values, 0 for empty), which may mix orders
+# puzzles that still have open spaces after propagation are filled in as far as propagation got, loaded into
+# boardClass, and searched by solverClass (with budget, if given)
+# returns one (values, status) per puzzle in the same order, where status is 'solved', 'unsolvable', or the
+# SearchInterrupted reason; values is the solution, or the puzzle itself if it was not solved
+def solveBatch(puzzles, boardClass=a2.BitBoard, solverClass=a2.Solver, budget=None):
+
+    results = [None] * len(puzzles)
+    orders = {}
+    for index, puzzle in enumerate(puzzles):
+        orders.setdefault(len(puzzle), []).append(index)
+
+    for spaces, indexes in orders.items():
+        n = int(round(spaces ** 0.25))
+        if n ** 4 != spaces:
+            raise Exception('A board must have n^4 values, found ' + str(spaces))
+        n2 = n * n
+
+        values = np.array([puzzles[index] for index in indexes], dtype=np.int64)
+        candidates = loadCandidates(values, n2)
+        contradiction = propagate(candidates, n)
+        counts = candidates.sum(2)
+        filled = np.where(counts == 1, candidates.argmax(2) + 1, 0)
+        complete = (counts == 1).all(1) & ~contradiction
+
+        solver = solverClass()
+        for row, index in enumerate(indexes):
+            if contradiction[row]:
+                results[index] = (list(puzzles[index]), 'unsolvable')
+            elif complete[row]:
+                results[index] = (filled[row].tolist(), 'solved')
+            else:
+                board = boardClass.fromValues(filled[row].tolist())
+                try:
+                    status = 'solved' if solver.solveBoard(board, budget) else 'unsolvable'
+                except a2.SearchInterrupted as interrupted:
+                    status = interrupted.reason
+                if status == 'solved':
+                    results[index] = ([board.board[divmod(i, n2)] for i in range(spaces)], status)
+                else:
+                    results[index] = (list(puzzles[index]), status)
+    return results
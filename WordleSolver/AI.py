@@ -1,18 +1,41 @@
 #bot that will guess randomly from possible correct answers
 
 import random
+import numpy as np
+import decisiontree
+import feedback
 import game
+import transposition
 
 class AIGuessing:
-    def __init__(self):
+    #feedback for every guess/answer pair, loaded once and shared by every AIGuessing
+    table = None
+    #results of the game tree search, shared by every AIGuessing so they carry over between games
+    #(pass a path to load them from a file, and call transpositions.save() to write them back)
+    transpositions = None
+    #the precomputed strategy of GuessFromDecisionTree, built or loaded on first use
+    tree = None
+
+    def __init__(self, transpositionPath=None, verbose=True):
         self.words = []
+        #print the confidence of the game tree guesses
+        self.verbose = verbose
+
+        if AIGuessing.table is None:
+            AIGuessing.table = feedback.FeedbackTable()
+        if AIGuessing.transpositions is None or transpositionPath is not None:
+            AIGuessing.transpositions = transposition.TranspositionTable(transpositionPath)
 
 
         with open("./wordleWords.txt","r") as fp:
             self.words = fp.readlines()
             for i in range(len(self.words)):
                 self.words[i] = self.words[i][:5]
-                
+        self.wordIndices = self.table.indices(self.words)
+
+    def history(self, board):
+        #every method takes either a feedback.History or a list of strings like 'dealt20100'
+        return feedback.History.fromBoard(self.table, board)
     
     def guessRandom(self, board):
         
@@ -22,21 +45,22 @@ class AIGuessing:
 
     def guessSmartRandom(self, board):
         
+        board = self.history(board)
         possibleWords = []
 
         #find which letters we know are in the right position
         correctLetters = ['0', '0', '0', '0', '0']
         includedLetters = []
         unincludedLetters = []
-        for guess in board:
-            for x in range(5, 10):
-                if (guess[x] == '2'):
-                    #print('found ', guess[x-5], " at ", x-5)
-                    correctLetters[x-5] = guess[x-5]
-                if (guess[x] == '1'):
-                    includedLetters.append(guess[x-5])
-                if (guess[x] == '0'):
-                    unincludedLetters.append(guess[x-5])
+        for guess, colors in board:
+            for x in range(5):
+                if (colors[x] == 2):
+                    #print('found ', guess[x], " at ", x)
+                    correctLetters[x] = guess[x]
+                if (colors[x] == 1):
+                    includedLetters.append(guess[x])
+                if (colors[x] == 0):
+                    unincludedLetters.append(guess[x])
 
         #only add words that could be correct
         for word in self.words:
@@ -65,130 +89,48 @@ class AIGuessing:
 
     def guessBasedOnLetterFrequency(self, board):
         
-        possibleWords = self.PossibleWords(board, self.words)
-
-        frequencies = {
-    'a': 0,
-    'b': 0,
-    'c': 0,
-    'd': 0,
-    'e': 0,
-    'f': 0,
-    'g': 0,
-    'h': 0,
-    'i': 0,
-    'j': 0,
-    'k': 0,
-    'l': 0,
-    'm': 0,
-    'n': 0,
-    'o': 0,
-    'p': 0,
-    'q': 0,
-    'r': 0,
-    's': 0,
-    't': 0,
-    'u': 0,
-    'v': 0,
-    'w': 0,
-    'x': 0,
-    'y': 0,
-    'z': 0}
-        #count letters in all possible words
-        for word in possibleWords:
-            for x in range (5):
-                frequencies[word[x]] += 1
-        
-        wordsScores = []
-
-        correctLetters = ['0', '0', '0', '0', '0']
-        includedLetters = []
-        badLetters = []
-        for guess in board:
-
-            for x in range(5, 10):
-                if (guess[x] == '2'):
-                    #print('found ', guess[x-5], " at ", x-5)
-                    correctLetters[x-5] = guess[x-5]
-                if (guess[x] == '1'):
-                    includedLetters.append(guess[x-5])
-                if (guess[x] == '0'):
-                    badLetters.append(guess[x-5])
+        board = self.history(board)
+        candidates = self.FilterIndices(board, self.wordIndices)
+        #if no options (the wordle is not in wordleWords.txt), return last guess
+        if (len(candidates) == 0):
+            return board.word(len(board)-1)
+        letters = self.table.letters[candidates]
 
+        #count letters in all possible words
+        frequencies = np.bincount(letters.ravel(), minlength=26)
 
         #score letters based on using more frequent letters. Ignores repeated letters to test for more
         #possible letters. low score = good choice
-        for word in possibleWords:
-            score = 0
-            for x in range (5):
-                score -= frequencies[word[x]]
-
-                for y in range (x):
-                    if (word[y] == word[x]):
-                        score += frequencies[word[x]]
-                        break
-                
-            wordsScores.append((score, word))
-        word = min(wordsScores, key=lambda x: x[0])
-        return word[1]
+        firstUse = np.ones(letters.shape, dtype=bool)
+        for x in range(1, 5):
+            firstUse[:, x] = (letters[:, :x] != letters[:, x:x + 1]).all(1)
+        scores = -(frequencies[letters] * firstUse).sum(1)
+        return self.table.words[candidates[np.argmin(scores)]]
 
     def PossibleWords(self, board, currentOptions):
 
-        possibleWords = []
-
-        #find which letters we know are in the right position
-        correctLetters = ['0', '0', '0', '0', '0']
-        includedLetters = []
-        badLetters = []
-        for guess in board:
-
-            for x in range(5, 10):
-                if (guess[x] == '2'):
-                    #print('found ', guess[x-5], " at ", x-5)
-                    correctLetters[x-5] = guess[x-5]
-                if (guess[x] == '1'):
-                    includedLetters.append(guess[x-5])
-                if (guess[x] == '0'):
-                    badLetters.append(guess[x-5])
-
-        #only add words that could be correct
-        for word in currentOptions:
-            add = True
-
-            #use known letters in correct position
-            for x in range (5):
-                if (correctLetters[x] != '0' and word[x] != correctLetters[x]):
-                    add = False
-                    break
-
-            #use known letters in incorrect position
-            for letter in includedLetters:
-                if (not word.__contains__(letter)):
-                    add = False
-                    break
+        #keep exactly the words that would have given every feedback on the board
+        board = self.history(board)
+        if currentOptions is self.words:
+            candidates = self.wordIndices
+        else:
+            candidates = self.table.indices(currentOptions)
 
-            for guesses in board:
-                if word == guesses[:5]:
-                    add = False
-                    break
-                for x in range(5, 10):
-                    if (guess[x] == '1' and word[x-5] == guess[x-5]):
-                        add = False
-                        break
-
-            #discard words with bad letters
-            for letter in badLetters:
-                if (word.__contains__(letter) and not correctLetters.__contains__(letter) and not includedLetters.__contains__(letter)):
-                    add = False
-            
-            
+        words = self.table.words
+        return [words[i] for i in self.FilterIndices(board, candidates)]
 
-            if add:
-                possibleWords.append(word)
-        return possibleWords
+    def FilterIndices(self, board, candidates):
+        #one vectorized comparison per guess: a candidate stays if its pattern against the guess is the one observed
+        matrix = self.table.matrix
+        for guess, pattern in zip(board.guesses, board.patterns):
+            if not len(candidates):
+                break
+            candidates = candidates[matrix[guess][candidates] == pattern]
+        return candidates
 
     def GuessWithStarterWords(self, board, guessesRemaining):
         #guess coals, then niter, then use another algorithm for future guesses
+        board = self.history(board)
         if (guessesRemaining == 6):
             return "dealt"
         elif (guessesRemaining == 5):
@@ -199,56 +141,91 @@ class AIGuessing:
                 return self.guessBasedOnLetterFrequency(board)
             else:
                 result, confidence = self.GuessHighestProbability(board, guessesRemaining, possibleWords)
-                print("guess confidence: ", confidence)
+                if self.verbose:
+                    print("guess confidence: ", confidence)
                 return result
         
     def GuessToMinimizePossibleWords(self, board, guessesRemaining):
 
-        currentWords = self.PossibleWords(board, self.words)
-
-    
+        board = self.history(board)
+        candidates = self.FilterIndices(board, self.wordIndices)
 
         if (guessesRemaining == 6):
             return "dealt"
         elif (guessesRemaining == 5):
             return self.guessBasedOnLetterFrequency(board)
-        elif (len(currentWords) == 1):
-            return currentWords[0]
+        elif (len(candidates) == 0):
+            return board.word(len(board)-1)
         else:
-            #to check quality of a guess,
-            #make that guess, and see how you many possible words are left if each word was the wordle
-            #average those results
-            bestScore = len(currentWords)
-            word = 'splat'
-            for guess in currentWords:
-                score = 0
-                for word in currentWords:
-                    guessResult = self.checkGuess(word, guess)
-                    board.append(guessResult)
-                    score += len(self.PossibleWords(board, currentWords))
-                    board.remove(guessResult)
-                    if (score > bestScore * len(currentWords)):
-                        break
-                score = score / len(currentWords)
-                if (score < bestScore):
-                    word = guess
-                    bestScore = score
-                
-
-            return word
+            return self.table.words[self.MinimizeExpectedIndex(candidates)]
+
+    def MinimizeExpectedIndex(self, candidates):
+        #the table index of the guess that leaves the fewest candidates on average
+        if (len(candidates) <= 2):
+            return candidates[0]
+        #to check quality of a guess,
+        #count how many possible words land on each colorKey if each word was the wordle, for every guess at once
+        #and take the guess with the fewest words left on average
+        expected, entropy, worst = self.table.scoreGuesses(self.wordIndices, candidates)
+        return self.BestIndex(expected, candidates)
+
+    def GuessMaximizeEntropy(self, board, guessesRemaining):
+        #first guess dealt, then the guess whose feedback is expected to tell the most (in bits) about the wordle
+        board = self.history(board)
+        candidates = self.FilterIndices(board, self.wordIndices)
+
+        if (guessesRemaining == 6):
+            return "dealt"
+        elif (len(candidates) <= 2):
+            return self.table.words[candidates[0]] if len(candidates) else board.word(len(board)-1)
+        else:
+            expected, entropy, worst = self.table.scoreGuesses(self.wordIndices, candidates)
+            return self.BestGuess(-entropy, candidates)
+
+    def BestGuess(self, scores, candidates):
+        return self.table.words[self.BestIndex(scores, candidates)]
+
+    def BestIndex(self, scores, candidates):
+        #the table index of the guess with the lowest score, preferring a word that could still be the wordle on ties
+        couldWin = np.isin(self.wordIndices, candidates)
+        return self.wordIndices[np.lexsort((~couldWin, np.round(scores, 9)))[0]]
+
+    def decisionTree(self):
+        if AIGuessing.tree is None:
+            AIGuessing.tree = decisiontree.DecisionTree(self.table, self.MinimizeExpectedIndex, "MinimizeExpected")
+        return AIGuessing.tree
+
+    def GuessFromDecisionTree(self, board, guessesRemaining):
+        #dealt, then the guess that leaves the fewest answers of lessWords.txt on average, looked up in a tree built
+        #offline (see decisiontree.py). a game the tree does not cover (a wordle outside lessWords.txt) falls back to
+        #searching the words that are still possible
+        board = self.history(board)
+        guess = self.decisionTree().guess(board)
+        if guess is None:
+            candidates = self.FilterIndices(board, self.wordIndices)
+            if (len(candidates) == 0):
+                return board.word(len(board)-1)
+            guess = self.MinimizeExpectedIndex(candidates)
+        return self.table.words[guess]
         
     
-    def GuessMinimizePossibleWords(self, board, guessesLeft):
+    def GuessMinimizePossibleWords(self, board, guessesLeft, search=None):
         #final algorithm, 90% accuracy
         #first guess dealt, then 2 guesses based on letter frequency, then use a game tree for final guesses
+        #with a parallel.ParallelSearch, the guesses at the top of the game tree are scored across its worker processes
+        board = self.history(board)
         if (guessesLeft == 6):
             return "dealt"
         elif (guessesLeft > 3):
             return self.guessBasedOnLetterFrequency(board)
         else:
             possibleWords = self.PossibleWords(board, self.words)
-            guess, confidence = self.GuessMinimizePossibleWordsHelper(board, guessesLeft, possibleWords)
-            print("confidence of guess ", guess, ": ", confidence)
+            if search is not None:
+                guess, confidence = search.GuessMinimizePossibleWordsHelper(self, board, guessesLeft, possibleWords)
+            else:
+                guess, confidence = self.GuessMinimizePossibleWordsHelper(board, guessesLeft, possibleWords)
+            if self.verbose:
+                print("confidence of guess ", guess, ": ", confidence)
             return guess
 
 
@@ -260,9 +237,11 @@ class AIGuessing:
         #can take ~30 seconds to find a guess with lots of possibleWords left, but hasn't taken
         #longer than this based on testing.
 
+        board = self.history(board)
+
         #if no options, return last guess
         if (len(possibleWords) == 0):
-            lastGuess = board[len(board)-1][:5]
+            lastGuess = board.word(len(board)-1)
             return (lastGuess, 1)
 
         #if one option, return it
@@ -273,82 +252,74 @@ class AIGuessing:
         if (guessesLeft == 1):
             randomIndex = random.randrange(len(possibleWords))
             return (possibleWords[randomIndex], len(possibleWords))
-        
+
+        #the same possible words with the same guesses left were already searched through another guess order
+        key = transposition.fingerprint(self.table.indices(possibleWords), guessesLeft)
+        known = self.transpositions.get(key)
+        if known is not None:
+            return known
 
         bestScore = 9999999999999999
         bestGuess = "guess"
 
         #find guess with lowest average possible words left after guessing
         for guess in possibleWords:
-            score = 0
-            
-            #find all possible colorKeys after this guess
-            colorKeys = self.FindColorKeys(guess, board, possibleWords)
-
-            for colorKey in colorKeys:
-                #for each colorKey, find the average score after this response
-                board.append(colorKey)
-                newPossibleWords = self.PossibleWords(board, possibleWords)
-                colorKeyScore = self.GuessMinimizePossibleWordsHelper(board, guessesLeft-1, newPossibleWords)
-                board.remove(colorKey)
-
-                #add to the score based on the frequency of this colorKey (given in self.FindColorKeys)
-                score += colorKeyScore[1] * colorKeys[colorKey]
-                
-                #skip scoring if already a bad option
-                if (score > bestScore):
-                    break
+            score = self.ScoreGuess(board, guessesLeft, possibleWords, guess, lambda: bestScore)
             
             if (score < bestScore):
                 bestScore = score
                 bestGuess = guess
 
+        self.transpositions.put(key, (bestGuess, bestScore))
         return (bestGuess, bestScore) 
+
+    def ScoreGuess(self, board, guessesLeft, possibleWords, guess, bound):
+        #the score of one guess in GuessMinimizePossibleWordsHelper: the number of possible words left after each
+        #colorKey, weighted by how many words give that colorKey. scoring stops once the score is above bound()
+        #(the best score found so far), since the guess can no longer be the best one
+        score = 0
+
+        #find all possible colorKeys (as pattern ids) after this guess
+        colorKeys = self.FindPatterns(guess, possibleWords)
+        guessIndex = self.table.index[guess]
+
+        for colorKey in colorKeys:
+            #for each colorKey, find the average score after this response
+            board.append(guessIndex, colorKey)
+            newPossibleWords = self.PossibleWords(board, possibleWords)
+            colorKeyScore = self.GuessMinimizePossibleWordsHelper(board, guessesLeft-1, newPossibleWords)
+            board.pop()
+
+            #add to the score based on the frequency of this colorKey (given in self.FindColorKeys)
+            score += colorKeyScore[1] * colorKeys[colorKey]
+
+            #skip scoring if already a bad option
+            if (score > bound()):
+                break
+        return score
     
     def checkGuess(self, word, guess):
 
-        #make a string to store the guess's accuracy
-        colorKey = ""
-        
-        # finding the word's accuracy
-        for x in range (5):
-            if guess[x] == word[x]:
-                colorKey += '2'
-            elif guess[x] in word:
-                #checking cases to display yellows correctly
-                yellowNeeded = 0
-                yellowCount = 0
-                for i in range (x):
-                    if (guess[x] == guess[i] and colorKey[i] == '1'):
-                        yellowCount += 1
-                for i in range (5):
-                    if (guess[x] == word[i]):
-                        yellowNeeded += 1
-                        if (word[i] == guess[i]):
-                            yellowNeeded -= 1
-                    
-                if (yellowNeeded > yellowCount):
-                    colorKey += '1'
-                else:
-                    colorKey += '0'
-            else:
-                colorKey += '0'
-
-        return guess + colorKey
+        #look the guess's accuracy up in the feedback table
+        return guess + self.table.colorKey(guess, word)
 
     
     def FindColorKeys(self, guess, board, possibleWords):
         #finds all possible results after some guess, and likelihoods of each result
 
         colorKeys = {}
-        for word in possibleWords:
-            guessResult = self.checkGuess(word, guess)
-            if (colorKeys.__contains__(guessResult)):
-                colorKeys[guessResult] += 1
-            else:
-                colorKeys[guessResult] = 1
+        for pattern, count in self.FindPatterns(guess, possibleWords).items():
+            colorKeys[guess + feedback.patternToColorKey(pattern)] = count
         #colorKeys = sorted(colorKeys, key=lambda x: colorKeys[x])
 
 
         return colorKeys
+
+    def FindPatterns(self, guess, possibleWords):
+        #FindColorKeys with pattern ids as keys, for the search (no strings are built)
+
+        #count how many possible words give each pattern id, straight from the feedback table
+        patterns = self.table.patterns(guess, self.table.indices(possibleWords))
+        counts = np.bincount(patterns, minlength=feedback.ALL_GREEN + 1)
+        return {int(pattern): int(counts[pattern]) for pattern in np.flatnonzero(counts)}
    
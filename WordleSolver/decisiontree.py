@@ -0,0 +1,129 @@
+#a precomputed strategy: the guess to make after every sequence of feedback, played from an opener
+
+# the tree is built offline by playing every answer in lessWords.txt at once: each node holds the guess made there
+# and the answers that are still possible, and every feedback of that guess other than all green leads to a child
+# whose guess is picked by the strategy passed in. a game that follows the tree then needs one dict lookup per move
+
+# the tree is stored as three arrays with one entry per node (the parent node, the pattern id that leads from the
+# parent to the node, and the node's guess as an index into the feedback table), saved next to this file as
+# tree_<checksum>.npz. the checksum covers the words, the answers, the opener and the strategy's name, so a stale
+# tree is never loaded
+#
+# usage: python3 decisiontree.py       (builds the tree for AIGuessing.GuessFromDecisionTree and prints its stats)
+
+import os
+import zlib
+
+import numpy as np
+
+import feedback
+
+ANSWER_FILE = "./lessWords.txt"
+OPENER = "dealt"
+ROOT = 0
+
+def treePath(table, answers, opener, strategy, directory=None):
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    checksum = zlib.crc32("\n".join(table.words).encode())
+    checksum = zlib.crc32(np.asarray(answers, dtype=np.int64).tobytes(), checksum)
+    checksum = zlib.crc32((opener + "\n" + strategy).encode(), checksum)
+    return os.path.join(directory, "tree_%08x.npz" % checksum)
+
+def buildTree(table, answers, opener, choose):
+    #returns the (parent, pattern, guess) arrays of the tree
+    #choose(candidates) is the strategy: the table index of the guess to make with these answer indices left
+    parents = [-1]
+    patterns = [feedback.ALL_GREEN]
+    guesses = [table.index[opener]]
+
+    #nodes whose children are not made yet, with the answers still possible at each
+    pending = [(ROOT, np.asarray(answers, dtype=np.intp))]
+    while pending:
+        node, candidates = pending.pop()
+        feedbacks = table.matrix[guesses[node]][candidates]
+        for pattern in np.unique(feedbacks):
+            if pattern == feedback.ALL_GREEN:
+                continue
+            remaining = candidates[feedbacks == pattern]
+            parents.append(node)
+            patterns.append(int(pattern))
+            guesses.append(int(choose(remaining)))
+            pending.append((len(guesses) - 1, remaining))
+
+    return (np.array(parents, dtype=np.int32), np.array(patterns, dtype=np.uint8),
+            np.array(guesses, dtype=np.uint16))
+
+class DecisionTree:
+    def __init__(self, table, choose, strategy, answers=None, opener=OPENER, path=None):
+        self.table = table
+        if answers is None:
+            answers = table.indices(feedback.loadWords(ANSWER_FILE))
+        self.path = path or treePath(table, answers, opener, strategy)
+
+        if not os.path.exists(self.path):
+            #write through a temporary file, so a run that is interrupted never leaves half a tree behind
+            parents, patterns, guesses = buildTree(table, answers, opener, choose)
+            temporary = self.path + ".tmp.npz"
+            np.savez_compressed(temporary, parents=parents, patterns=patterns, guesses=guesses)
+            os.replace(temporary, self.path)
+
+        with np.load(self.path) as arrays:
+            self.parents = arrays["parents"]
+            self.patterns = arrays["patterns"]
+            self.guesses = arrays["guesses"]
+        #(node, pattern id) -> child node
+        self.children = {(int(parent), int(pattern)): child
+                         for child, (parent, pattern) in enumerate(zip(self.parents, self.patterns)) if parent >= 0}
+
+    def __len__(self):
+        return len(self.guesses)
+
+    def node(self, history):
+        #the node a feedback.History leads to, or None if the game left the tree
+        node = ROOT
+        for guess, pattern in zip(history.guesses, history.patterns):
+            if guess != self.guesses[node]:
+                return None
+            node = self.children.get((node, pattern))
+            if node is None:
+                return None
+        return node
+
+    def guess(self, history):
+        #the table index of the next guess, or None if the game left the tree
+        node = self.node(history)
+        return None if node is None else int(self.guesses[node])
+
+    def depths(self):
+        #the number of guesses every node is reached after (the root is 0)
+        depths = np.zeros(len(self), dtype=np.intp)
+        for node in range(1, len(self)):
+            depths[node] = depths[self.parents[node]] + 1
+        return depths
+
+def main():
+    import AI
+
+    ai = AI.AIGuessing()
+    tree = ai.decisionTree()
+    answers = ai.table.indices(feedback.loadWords(ANSWER_FILE))
+
+    #play every answer down the tree
+    guessCounts = []
+    for answer in answers:
+        history = feedback.History(ai.table)
+        node = ROOT
+        while tree.guesses[node] != answer:
+            history.append(int(tree.guesses[node]), int(ai.table.matrix[tree.guesses[node], answer]))
+            node = tree.node(history)
+        guessCounts.append(len(history) + 1)
+
+    counts = np.bincount(guessCounts)
+    print("tree:", tree.path, "with", len(tree), "nodes,", os.path.getsize(tree.path), "bytes")
+    print("answers:", len(answers), " average guesses: %.4f" % np.mean(guessCounts),
+          " solved in 6: %d" % sum(counts[:7]), " deepest node:", tree.depths().max())
+    for guesses in range(1, len(counts)):
+        print("  %d guesses: %d" % (guesses, counts[guesses]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#plays a strategy against every answer in lessWords.txt (or a seeded sample of them) without printing
+
+# the games run across a pool of worker processes. each worker makes one AIGuessing in its initializer (reading the
+# word lists and memory-mapping the feedback table once) and plays every game it gets with it. the report gives the
+# win rate, how many games took each number of guesses, and percentiles of the time the strategy took per move,
+# and can be written as JSON so two runs can be diffed
+#
+# usage: python3 evaluate.py --strategy decision-tree
+#        python3 evaluate.py --strategy game-tree --sample 200 --seed 1 -o gametree.json
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import AI
+import feedback
+import game
+
+#AIGuessing methods that take (board, guessesRemaining)
+STRATEGIES = {
+    'minimize-expected': 'GuessToMinimizePossibleWords',
+    'entropy': 'GuessMaximizeEntropy',
+    'decision-tree': 'GuessFromDecisionTree',
+    'game-tree': 'GuessMinimizePossibleWords',
+}
+
+ANSWER_FILE = "./lessWords.txt"
+
+#the AIGuessing and the strategy of a worker process
+worker = None
+
+def initWorker(strategy):
+    global worker
+    ai = AI.AIGuessing(verbose=False)
+    worker = (ai, getattr(ai, STRATEGIES[strategy]))
+
+def playTask(answer):
+    #pool task: plays one game, returning (answer, won, guesses used, seconds per move)
+    ai, strategy = worker
+    wordle = game.Wordle(ai, answer, verbose=False)
+    won = wordle.playUsingAI(strategy)
+    return answer, won, 7 - wordle.remainingGuesses if won else None, wordle.moveSeconds
+
+#returns the value below which fraction of the sorted values fall (nearest rank)
+def percentile(sortedValues, fraction):
+    if not sortedValues:
+        return None
+    index = min(len(sortedValues) - 1, max(0, int(round(fraction * len(sortedValues))) - 1))
+    return sortedValues[index]
+
+def evaluate(strategy, answers, workers=None):
+    #plays every answer, returning the report and the per-game results
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers or os.cpu_count() or 1, initWorker, (strategy,)) as pool:
+        games = pool.map(playTask, answers, chunksize=16)
+    seconds = time.perf_counter() - start
+
+    wins = [guesses for _, won, guesses, _ in games if won]
+    moves = sorted(move for _, _, _, moveSeconds in games for move in moveSeconds)
+    distribution = {str(guesses): wins.count(guesses) for guesses in range(1, 7)}
+    distribution['lost'] = len(games) - len(wins)
+
+    #95% interval of the win rate (Wilson score), so a sample's rate is read with its uncertainty
+    n = len(games)
+    rate = len(wins) / n if n else 0.0
+    z = 1.96
+    center = (rate + z * z / (2 * n)) / (1 + z * z / n) if n else 0.0
+    margin = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n) if n else 0.0
+
+    report = {
+        'strategy': strategy,
+        'games': n,
+        'wins': len(wins),
+        'winRate': rate,
+        'winRateInterval': [center - margin, center + margin],
+        'meanGuessesWhenWon': sum(wins) / len(wins) if wins else None,
+        'guesses': distribution,
+        'moves': len(moves),
+        'p50MoveSeconds': percentile(moves, 0.50),
+        'p90MoveSeconds': percentile(moves, 0.90),
+        'p99MoveSeconds': percentile(moves, 0.99),
+        'maxMoveSeconds': moves[-1] if moves else None,
+        'totalSeconds': seconds,
+    }
+    return report, [{'answer': answer, 'won': won, 'guesses': guesses, 'moveSeconds': moveSeconds}
+                    for answer, won, guesses, moveSeconds in games]
+
+def main():
+    parser = argparse.ArgumentParser(description='Play a Wordle strategy against every answer and report how it does.')
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='minimize-expected')
+    parser.add_argument('--sample', type=int, default=0, help='play this many random answers instead of all of them')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the sample, so runs are comparable')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--results', action='store_true', help='include every game in the JSON report')
+    parser.add_argument('-o', '--json', help='file to write the JSON report to')
+    args = parser.parse_args()
+
+    answers = feedback.loadWords(ANSWER_FILE)
+    if args.sample:
+        answers = random.Random(args.seed).sample(answers, min(args.sample, len(answers)))
+
+    report, games = evaluate(args.strategy, answers, args.workers)
+    if args.results:
+        report['results'] = games
+
+    low, high = report['winRateInterval']
+    print('%s: won %d/%d (%.2f%%, 95%% interval %.2f-%.2f%%)  mean guesses %.3f' % (
+          args.strategy, report['wins'], len(answers), 100 * report['winRate'], 100 * low, 100 * high,
+          report['meanGuessesWhenWon'] or 0), file=sys.stderr)
+    print('guesses: ' + '  '.join('%s: %d' % item for item in report['guesses'].items()), file=sys.stderr)
+    print('per move: p50 %.5fs  p90 %.5fs  p99 %.5fs  max %.5fs  (%d moves, %.1fs total)' % (
+          report['p50MoveSeconds'], report['p90MoveSeconds'], report['p99MoveSeconds'], report['maxMoveSeconds'],
+          report['moves'], report['totalSeconds']), file=sys.stderr)
+
+    if args.json:
+        with open(args.json, 'w') as jsonFile:
+            json.dump(report, jsonFile, indent=2)
+
+if __name__ == "__main__":
+    main()
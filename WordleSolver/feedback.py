@@ -0,0 +1,219 @@
+#precomputed feedback for every guess/answer pair
+
+# a feedback (colorKey) like '20100' is stored as its pattern id, the colorKey read as a base 3 number
+# (0 = gray, 1 = yellow, 2 = green, first letter most significant), so ids run from 0 ('00000') to 242 ('22222')
+
+# the table is a uint8 matrix with one row per guess and one column per answer over every word in wordleWords.txt
+# and lessWords.txt. it is built once with numpy, saved next to this file as feedback_<checksum>.npy (the checksum
+# changes with the word lists, so a stale table is never loaded), and memory-mapped on later runs
+
+import array
+import os
+import zlib
+
+import numpy as np
+
+WORD_FILES = ["./wordleWords.txt", "./lessWords.txt"]
+ALL_GREEN = 242
+
+def loadWords(path):
+    #same format as AIGuessing: one word per line, first 5 characters
+    with open(path, "r") as fp:
+        return [line[:5] for line in fp.readlines()]
+
+def vocabulary(paths=WORD_FILES):
+    #every word of the files, in file order, without repeats
+    words = []
+    seen = set()
+    for path in paths:
+        for word in loadWords(path):
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+    return words
+
+def colorKeyToPattern(colorKey):
+    return int(colorKey, 3)
+
+def patternToColorKey(pattern):
+    colorKey = ""
+    for x in range(5):
+        colorKey = str(pattern % 3) + colorKey
+        pattern //= 3
+    return colorKey
+
+def scorePattern(guess, answer):
+    #the pattern id for one pair, for words that are not in the table
+    #a letter that is not green is yellow while the answer still has unmatched copies of it: the copies of that
+    #letter in the answer that are not green, minus the ones already used by earlier yellows in the guess
+    greens = [guess[x] == answer[x] for x in range(5)]
+    pattern = 0
+    for x in range(5):
+        if greens[x]:
+            digit = 2
+        else:
+            available = sum(1 for i in range(5) if answer[i] == guess[x] and not greens[i])
+            earlier = sum(1 for i in range(x) if guess[i] == guess[x] and not greens[i])
+            digit = 1 if earlier < available else 0
+        pattern = pattern * 3 + digit
+    return pattern
+
+def encodeWords(words):
+    #(words, 5) array of letters
+    return np.frombuffer("".join(words).encode(), dtype=np.uint8).reshape(len(words), 5)
+
+def buildMatrix(words, chunkSize=256):
+    #the same rule as scorePattern, for a block of guesses against every answer at once
+    letters = encodeWords(words)
+    matrix = np.empty((len(words), len(words)), dtype=np.uint8)
+    answers = letters[None, :, :]
+
+    for start in range(0, len(words), chunkSize):
+        guesses = letters[start:start + chunkSize, None, :]
+        greens = guesses == answers
+        pattern = np.zeros(greens.shape[:2], dtype=np.uint8)
+
+        for x in range(5):
+            letter = guesses[:, :, x:x + 1]
+            available = ((answers == letter) & ~greens).sum(2)
+            earlier = ((guesses[:, :, :x] == letter) & ~greens[:, :, :x]).sum(2)
+            yellow = ~greens[:, :, x] & (earlier < available)
+            pattern = pattern * 3 + np.where(greens[:, :, x], 2, yellow).astype(np.uint8)
+
+        matrix[start:start + chunkSize] = pattern
+    return matrix
+
+def tablePath(words, directory=None):
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    checksum = zlib.crc32("\n".join(words).encode())
+    return os.path.join(directory, "feedback_%08x.npy" % checksum)
+
+class FeedbackTable:
+    def __init__(self, words=None, path=None):
+        self.words = words or vocabulary()
+        self.index = {word: i for i, word in enumerate(self.words)}
+        self.path = path or tablePath(self.words)
+
+        if not os.path.exists(self.path):
+            #write through a temporary file, so a run that is interrupted never leaves half a table behind
+            temporary = self.path + ".tmp.npy"
+            np.save(temporary, buildMatrix(self.words))
+            os.replace(temporary, self.path)
+        self.matrix = np.load(self.path, mmap_mode="r")
+        #letters of every word as 0..25, for letter counting
+        self.letters = encodeWords(self.words) - ord("a")
+
+    def indices(self, words):
+        #row/column numbers of a list of words
+        return np.fromiter((self.index[word] for word in words), dtype=np.intp, count=len(words))
+
+    def pattern(self, guess, answer):
+        if guess in self.index and answer in self.index:
+            return int(self.matrix[self.index[guess], self.index[answer]])
+        return scorePattern(guess, answer)
+
+    def colorKey(self, guess, answer):
+        return patternToColorKey(self.pattern(guess, answer))
+
+    def patterns(self, guess, answers):
+        #pattern ids of one guess against an array of answer indices
+        if guess in self.index:
+            return self.matrix[self.index[guess]][answers]
+        return np.array([scorePattern(guess, self.words[answer]) for answer in answers], dtype=np.uint8)
+
+    def scoreGuesses(self, guesses, candidates, blockSize=1 << 24):
+        #for every guess, counts how many candidates fall in each of the 243 feedback buckets and returns three
+        #arrays with one score per guess:
+        #  expected - the expected number of candidates left after the guess (sum of squared bucket sizes / candidates)
+        #  entropy  - the expected information of the feedback in bits
+        #  worst    - the size of the largest bucket
+        total = len(candidates)
+        expected = np.zeros(len(guesses))
+        entropy = np.zeros(len(guesses))
+        worst = np.zeros(len(guesses), dtype=np.intp)
+        if total == 0:
+            return expected, entropy, worst
+
+        #bucket size * log2(bucket size) for every size a bucket can have
+        sizes = np.arange(total + 1)
+        sizeLogSize = sizes * np.log2(np.maximum(sizes, 1))
+
+        #the rows of guesses that are a prefix of the table are sliced instead of copied
+        prefix = bool(len(guesses)) and guesses[0] == 0 and np.array_equal(guesses, np.arange(len(guesses)))
+        step = max(1, blockSize // total)
+        for start in range(0, len(guesses), step):
+            stop = min(start + step, len(guesses))
+            rows = self.matrix[start:stop] if prefix else self.matrix[guesses[start:stop]]
+            block = rows[:, candidates]
+
+            if total <= ALL_GREEN:
+                #few candidates: sort each guess's patterns, so every bucket is a run of equal patterns
+                block.sort(axis=1)
+                starts = np.ones(block.shape, dtype=bool)
+                starts[:, 1:] = block[:, 1:] != block[:, :-1]
+                runStarts = np.flatnonzero(starts.ravel())
+                runs = np.diff(np.append(runStarts, block.size))
+                firstRuns = np.flatnonzero(runStarts % total == 0)
+                squares = np.add.reduceat(runs * runs, firstRuns)
+                spread = np.add.reduceat(sizeLogSize[runs], firstRuns)
+                largest = np.maximum.reduceat(runs, firstRuns)
+            else:
+                #many candidates: one bincount over the whole block, offsetting each guess by 243 buckets
+                block = block.astype(np.intp)
+                block += (np.arange(stop - start) * (ALL_GREEN + 1))[:, None]
+                counts = np.bincount(block.ravel(), minlength=(stop - start) * (ALL_GREEN + 1)).reshape(stop - start, -1)
+                squares = (counts * counts).sum(1)
+                spread = sizeLogSize[counts].sum(1)
+                largest = counts.max(1)
+
+            expected[start:stop] = squares / total
+            entropy[start:stop] = np.log2(total) - spread / total
+            worst[start:stop] = largest
+        return expected, entropy, worst
+
+#the five digits (0 = gray, 1 = yellow, 2 = green) of every pattern id
+PATTERN_DIGITS = [tuple(int(digit) for digit in patternToColorKey(pattern)) for pattern in range(ALL_GREEN + 1)]
+
+class History:
+    #the guesses of a game as word indices into table.words and their feedback as pattern ids,
+    #kept in two parallel arrays instead of strings like 'dealt20100'
+
+    def __init__(self, table, board=()):
+        self.table = table
+        self.guesses = array.array("I")
+        self.patterns = array.array("B")
+        for entry in board:
+            self.appendString(entry)
+
+    @classmethod
+    def fromBoard(cls, table, board):
+        #a History is used as it is, a list of strings is converted
+        if isinstance(board, History):
+            return board
+        return cls(table, board)
+
+    def append(self, guess, pattern):
+        self.guesses.append(guess)
+        self.patterns.append(pattern)
+
+    def appendString(self, entry):
+        self.append(self.table.index[entry[:5]], colorKeyToPattern(entry[5:10]))
+
+    def pop(self):
+        self.patterns.pop()
+        return self.guesses.pop()
+
+    def word(self, i):
+        return self.table.words[self.guesses[i]]
+
+    def __len__(self):
+        return len(self.guesses)
+
+    def __iter__(self):
+        #(guessed word, feedback digits) for every guess, oldest first
+        words = self.table.words
+        for guess, pattern in zip(self.guesses, self.patterns):
+            yield words[guess], PATTERN_DIGITS[pattern]
+
+    def toStrings(self):
+        return [self.word(i) + patternToColorKey(self.patterns[i]) for i in range(len(self))]
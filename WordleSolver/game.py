@@ -10,77 +10,64 @@
 # Current Code State: Functional manually, no algorithms implemented yet
 
 import random
+import time
 import AI
+import feedback
 
 class Wordle:
-    def __init__(self):
+    def __init__(self, ai=None, word=None, verbose=True):
+        #ai can be shared between games, so the word list and feedback table are only loaded once
+        #word picks the wordle instead of a random one, and verbose=False plays without printing
         self.remainingGuesses = 6
-        self.board = []
         self.word = ''
         self.words = []
-        self.ai = AI.AIGuessing()
+        self.ai = ai or AI.AIGuessing(verbose=verbose)
+        self.verbose = verbose
+        #guesses as word indices and feedback as pattern ids (see feedback.History)
+        self.board = feedback.History(self.ai.table)
+        #seconds the AI took for each of its guesses in playUsingAI
+        self.moveSeconds = []
         
 
-        print("Starting new game...")
-        # Opens file with all 5 letter words
-        with open("./wordleWords.txt","r") as fp:
-            self.words = fp.readlines()
-            for i in range(len(self.words)):
-                self.words[i] = self.words[i][:5]
-            
-        # generates an integer to randomly choose a word
+        if self.verbose:
+            print("Starting new game...")
+        #the AI's word list is the contents of wordleWords.txt
+        self.words = self.ai.words
+
+        if word is not None:
+            self.word = word
+        else:
+            # generates an integer to randomly choose a word
             randWord = random.randrange(0,len(self.words))
-        # gathers line number and contents of line
-            for lineNum, line in enumerate(self.words):
-            # conditional sets word variable to contents of line
-                if lineNum == randWord-1:
-                    self.word = line
-                    #self.word = "intro"
-                    print("Today's random word is", self.word) #see the word at the start for debugging
-                    break
+            self.word = self.words[randWord]
+            #self.word = "intro"
+            if self.verbose:
+                print("Today's random word is", self.word) #see the word at the start for debugging
         # now we have a randomly selected word as a string
 
     def makeGuess(self,guess):
 
-        #make a string to store the guess's accuracy
-        colorKey = ""
-        
-        # finding the word's accuracy
-        for x in range (5):
-            if guess[x] == self.word[x]:
-                colorKey += '2'
-            elif guess[x] in self.word:
-                #checking cases to display yellows correctly
-                yellowNeeded = 0
-                yellowCount = 0
-                for i in range (x):
-                    if (guess[x] == guess[i] and colorKey[i] == '1'):
-                        yellowCount += 1
-                for i in range (5):
-                    if (guess[x] == self.word[i]):
-                        yellowNeeded += 1
-                        if (self.word[i] == guess[i]):
-                            yellowNeeded -= 1
-                    
-                if (yellowNeeded > yellowCount):
-                    colorKey += '1'
-                else:
-                    colorKey += '0'
-            else:
-                colorKey += '0'
+        #the guess can be a word or its index in the feedback table
+        table = self.ai.table
+        if not isinstance(guess, str):
+            guess = table.words[guess]
 
-        if (colorKey == "22222"):
+        # finding the word's accuracy as a pattern id (0 = gray, 1 = yellow, 2 = green in each base 3 digit)
+        pattern = table.pattern(guess, self.word)
+
+        if (pattern == feedback.ALL_GREEN):
             return True
 
         #adding this guess to the Wordle's board
-        #guesses are stored as strings with 5 characters as the guess and 5 characters as the accuracy (0 = gray, 1 = yellow, 2 = green)
-        self.board.append(guess + colorKey)
+        #guesses are stored as the guess's word index and the accuracy's pattern id
+        self.board.append(table.index[guess], pattern)
 
         #removing one guess
         self.remainingGuesses -= 1
 
         #displaying the current state
-        self.printBoard()
+        if self.verbose:
+            self.printBoard()
 
     def playManually(self):
 
@@ -108,37 +95,42 @@ class Wordle:
             print("word was: ", self.word)
         print()
 
-    def playUsingAI(self):
+    def playUsingAI(self, strategy=None):
+
+        #strategy is an AIGuessing method that takes the board and the remaining guesses
+        strategy = strategy or self.ai.GuessToMinimizePossibleWords #only change this line to change which algorithm to use
 
         while(self.remainingGuesses > 0):
             
             #get algorithm's play
-            possibleWords = self.ai.PossibleWords(self.board, self.words)
-            #print("possible words left before guess: ", len(possibleWords))
-
-            AIguess = self.ai.GuessToMinimizePossibleWords(self.board, self.remainingGuesses) #only change this line to change which algorithm to use
-            print("AI chooses:", AIguess)
+            start = time.perf_counter()
+            AIguess = strategy(self.board, self.remainingGuesses)
+            self.moveSeconds.append(time.perf_counter() - start)
+            if self.verbose:
+                print("AI chooses:", AIguess)
 
             #run the AI's guess, record if they won or not
             win = self.makeGuess(AIguess)
 
             #if they won, end the game
             if (win):
-                print("you win! guesses used: ", 7 - self.remainingGuesses, "\n")
+                if self.verbose:
+                    print("you win! guesses used: ", 7 - self.remainingGuesses, "\n")
                 return True
 
         #if they use all guesses, they lose
-        print("you lose!\n")
+        if self.verbose:
+            print("you lose!\n")
         return False
             
 
 
     def printBoard(self):
-       for guess in self.board:
+       for guess, colors in self.board:
             for x in range (5):
-                if (guess[x + 5] == '0'):
+                if (colors[x] == 0):
                     print("_", end=" ")
-                elif (guess[x + 5] == '1'):
+                elif (colors[x] == 1):
                     print(guess[x].lower(), end=" ")
                 else:
                     print(guess[x].upper(), end=" ")
@@ -158,8 +150,10 @@ def main():
     wins = 0
     games = 10
 
+    #one AI for every game (see evaluate.py to test a strategy on every word)
+    ai = AI.AIGuessing()
     for x in range (games):
-        wordle = Wordle()
+        wordle = Wordle(ai)
         success = wordle.playUsingAI()
         if (success):
             wins += 1
@@ -0,0 +1,87 @@
+#runs the top level of the game tree search in GuessMinimizePossibleWordsHelper across a pool of worker processes
+
+# every guess of the possible words is scored in its own task. the workers are started once: each one reads the word
+# lists and memory-maps the feedback table in its initializer (the operating system shares the pages of the table
+# file between them), so a task only carries the board, the guesses left, and the possible words as indices
+#
+# the best score found so far is kept in a shared multiprocessing.Value. a worker stops scoring a guess once its
+# score is above that bound, the same early cut the search makes on one core, and lowers the bound when it finds a
+# better guess. the guess picked is the one the search on one core would pick: the first of the possible words with
+# the lowest score
+#
+# usage: with parallel.ParallelSearch() as search:
+#            guess = ai.GuessMinimizePossibleWords(board, guessesLeft, search)
+
+import math
+import multiprocessing
+import os
+
+import numpy as np
+
+import AI
+import feedback
+import transposition
+
+#the AIGuessing and the shared bound of a worker process
+worker = None
+
+def initWorker(bound):
+    global worker
+    worker = (AI.AIGuessing(), bound)
+
+def scoreTask(task):
+    #pool task: the score of one guess, or a score above the bound if it was cut
+    order, guess, guesses, patterns, guessesLeft, possibleIndices = task
+    ai, bound = worker
+
+    board = feedback.History(ai.table)
+    for guessIndex, pattern in zip(guesses, patterns):
+        board.append(guessIndex, pattern)
+    possibleWords = [ai.table.words[index] for index in np.frombuffer(possibleIndices, dtype=np.int32)]
+
+    score = ai.ScoreGuess(board, guessesLeft, possibleWords, guess, lambda: bound.value)
+    if score < bound.value:
+        with bound.get_lock():
+            bound.value = min(bound.value, score)
+    return order, score
+
+class ParallelSearch:
+    def __init__(self, workers=None):
+        self.bound = multiprocessing.Value("d", math.inf)
+        self.pool = multiprocessing.Pool(workers or os.cpu_count() or 1, initWorker, (self.bound,))
+
+    def GuessMinimizePossibleWordsHelper(self, ai, board, guessesLeft, possibleWords):
+        #the same (guess, score) as ai.GuessMinimizePossibleWordsHelper, with the guesses scored by the pool
+        board = ai.history(board)
+
+        #no words, one word, or the last guess: nothing to search
+        if (len(possibleWords) <= 1 or guessesLeft == 1):
+            return ai.GuessMinimizePossibleWordsHelper(board, guessesLeft, possibleWords)
+
+        indices = ai.table.indices(possibleWords)
+        key = transposition.fingerprint(indices, guessesLeft)
+        known = ai.transpositions.get(key)
+        if known is not None:
+            return known
+
+        self.bound.value = math.inf
+        possibleIndices = indices.astype(np.int32).tobytes()
+        guesses, patterns = list(board.guesses), list(board.patterns)
+        tasks = ((order, guess, guesses, patterns, guessesLeft, possibleIndices)
+                 for order, guess in enumerate(possibleWords))
+
+        #lowest score first, then the guess that comes first in possibleWords
+        best = min(self.pool.imap_unordered(scoreTask, tasks), key=lambda result: (result[1], result[0]))
+        result = (possibleWords[best[0]], best[1])
+        ai.transpositions.put(key, result)
+        return result
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
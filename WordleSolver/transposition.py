@@ -0,0 +1,61 @@
+#remembers results of the game tree search in GuessMinimizePossibleWordsHelper
+
+# different guess orders often leave the same possible words with the same number of guesses left, and the search
+# below that point does not depend on how it was reached. an entry is keyed by a fingerprint of the set of possible
+# words and the guesses left, and holds the (guess, score) the search returned
+
+# the table is bounded: once it holds maxEntries, the least recently used entry is evicted. with a path it is loaded
+# from that file and save() writes it back, so the results carry over to later games and runs
+
+import collections
+import hashlib
+import os
+import pickle
+
+import numpy as np
+
+def fingerprint(indices, guessesLeft):
+    #the key of a set of word indices (in any order) with guessesLeft guesses left
+    #the sorted indices are hashed to 16 bytes, so a key stays small however many words are left
+    digest = hashlib.blake2b(np.sort(np.asarray(indices, dtype=np.int64)).tobytes(), digest_size=16).digest()
+    return (guessesLeft, digest)
+
+class TranspositionTable:
+    def __init__(self, path=None, maxEntries=200000):
+        self.path = path
+        self.maxEntries = maxEntries
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as fp:
+                self.entries = pickle.load(fp)
+            while len(self.entries) > maxEntries:
+                self.entries.popitem(last=False)
+
+    def get(self, key):
+        #the stored (guess, score), or None
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def save(self):
+        #write through a temporary file, so an interrupted save keeps the old table
+        if self.path is None:
+            return
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as fp:
+            pickle.dump(self.entries, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self.path)